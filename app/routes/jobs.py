@@ -1,9 +1,12 @@
 """
 Job endpoints for background/maintenance tasks.
 """
+import click
 from flask import Blueprint, jsonify
 from flask_login import login_required, current_user
-from models.missed_sessions import mark_missed_sessions, cleanup_expired_makeup_queue
+from models.missed_sessions import (
+    mark_missed_sessions, mark_missed_sessions_all, cleanup_expired_makeup_queue
+)
 
 jobs = Blueprint('jobs', __name__, url_prefix='/jobs')
 
@@ -29,6 +32,16 @@ def mark_missed():
     })
 
 
+@jobs.cli.command('mark-missed-all')
+def mark_missed_all_command():
+    """
+    Mark overdue sessions as missed for all users, using each user's grace period.
+    Run from cron as `flask jobs mark-missed-all`; deliberately not an HTTP route.
+    """
+    count = mark_missed_sessions_all()
+    click.echo(f'{count} session(s) marked as missed')
+
+
 @jobs.route('/cleanup_expired', methods=['POST'])
 @login_required
 def cleanup_expired():
@@ -5,7 +5,7 @@ from flask_login import login_required, current_user
 
 from models.database import db, Subject, StudySession, SessionStatus, SessionType, Task
 from models.scheduler import StudyScheduler
-from utils.timezone_utils import localize_to_utc, utc_to_local
+from utils.timezone_utils import localize_to_utc, utc_to_local, format_many_for_client
 
 scheduler = Blueprint('scheduler', __name__, url_prefix='/scheduler')
 
@@ -33,9 +33,11 @@ def index():
     
     # Group sessions by day for better display
     days = {}
-    for study_session in current_schedule:
-        local_start = utc_to_local(study_session.start_time, current_user.timezone)
-        day = local_start.strftime('%Y-%m-%d')
+    local_days = format_many_for_client(
+        [study_session.start_time for study_session in current_schedule],
+        current_user.timezone, '%Y-%m-%d'
+    )
+    for study_session, day in zip(current_schedule, local_days):
         days.setdefault(day, []).append(study_session)
     days = dict(sorted(days.items()))
     
@@ -0,0 +1,32 @@
+"""Add 'assignment' to the native sessiontype enum
+
+Revision ID: 7b1d4e6c2f90
+Revises: 3c5e8f2a9d41
+Create Date: 2025-11-03 11:02:17.904633
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b1d4e6c2f90'
+down_revision = '3c5e8f2a9d41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # status/session_type are native ENUM types on Postgres (sessionstatus,
+    # sessiontype). The original sessiontype was created without 'assignment',
+    # which the scheduler writes for task-linked sessions.
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        # ALTER TYPE ... ADD VALUE cannot run inside a transaction block
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE sessiontype ADD VALUE IF NOT EXISTS 'assignment'")
+
+
+def downgrade():
+    # Postgres cannot drop a value from an enum type; leave it in place.
+    pass
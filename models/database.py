@@ -69,7 +69,13 @@ class User(db.Model, UserMixin):
         return check_password_hash(self.password_hash, password)
     
     def get_preferred_times(self):
-        return json.loads(self.preferred_study_times)
+        # Parsed dict is cached against the raw JSON so repeated reads skip json.loads
+        raw = self.preferred_study_times
+        cached = self.__dict__.get('_preferred_times_cache')
+        if cached is None or cached[0] != raw:
+            cached = (raw, json.loads(raw))
+            self._preferred_times_cache = cached
+        return dict(cached[1])
     
     def set_preferred_times(self, preferences_dict):
         self.preferred_study_times = json.dumps(preferences_dict)
@@ -90,8 +96,8 @@ class Subject(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey(FK_USERS_ID), nullable=False)
     name = db.Column(db.String(64), nullable=False)
     workload = db.Column(db.Integer)  # Hours per week
-    priority = db.Column(db.Integer)  # 1-5 scale
-    difficulty = db.Column(db.Integer)  # 1-5 scale
+    priority = db.Column(db.SmallInteger)  # 1-5 scale
+    difficulty = db.Column(db.SmallInteger)  # 1-5 scale
     exam_date = db.Column(db.DateTime, nullable=True)
     color = db.Column(db.String(7), default="#3498db")  
     notes = db.Column(db.Text)
@@ -121,8 +127,11 @@ class StudySession(db.Model):
     end_time = db.Column(db.DateTime, nullable=False)
     
     # Session categorization
-    status = db.Column(db.Enum(SessionStatus), default=SessionStatus.planned, nullable=False)
-    session_type = db.Column(db.Enum(SessionType), default=SessionType.learn, nullable=False)
+    # Native enums: Postgres stores these as 4-byte OIDs instead of VARCHAR
+    status = db.Column(db.Enum(SessionStatus, name='sessionstatus', native_enum=True),
+                       default=SessionStatus.planned, nullable=False)
+    session_type = db.Column(db.Enum(SessionType, name='sessiontype', native_enum=True),
+                             default=SessionType.learn, nullable=False)
     locked = db.Column(db.Boolean, default=False, nullable=False)  # Protect from regeneration
     
     # DEPRECATED: Keep completed for backward compatibility during migration
@@ -268,7 +277,7 @@ class UserConstraint(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey(FK_USERS_ID), nullable=False)
     title = db.Column(db.String(128), nullable=False)
-    day_of_week = db.Column(db.Integer, nullable=False)  # 0=Monday, 6=Sunday
+    day_of_week = db.Column(db.SmallInteger, nullable=False)  # 0=Monday, 6=Sunday
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
     is_hard = db.Column(db.Boolean, default=True, nullable=False)  # True = cannot schedule over
@@ -291,7 +300,7 @@ class ClassBlock(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey(FK_USERS_ID), nullable=False)
     title = db.Column(db.String(128), nullable=False)
-    day_of_week = db.Column(db.Integer, nullable=False)  # 0=Monday, 6=Sunday
+    day_of_week = db.Column(db.SmallInteger, nullable=False)  # 0=Monday, 6=Sunday
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
     location = db.Column(db.String(128))
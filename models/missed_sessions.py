@@ -4,30 +4,19 @@ Missed Sessions Management
 Handles automatic marking of missed sessions and rescheduling logic.
 """
 from datetime import datetime, timedelta, timezone
-from models.database import db, StudySession, SessionStatus, MakeupQueue
-from sqlalchemy import and_
+from models.database import db, StudySession, SessionStatus, MakeupQueue, Subject, StudyPreference
+from sqlalchemy import and_, func, select
 
 
-def mark_missed_sessions(user_id, grace_minutes=30):
-    """
-    Mark sessions as 'missed' if end_time + grace period has passed.
-    
-    Args:
-        user_id: The user ID to check sessions for
-        grace_minutes: Minutes of grace period after session end (default: 30)
-    
-    Returns:
-        int: Number of sessions marked as missed
-    """
+def _overdue_planned_sessions(grace_minutes):
+    """Build a query for planned sessions whose grace period has passed."""
     now = datetime.now(timezone.utc)
     grace_period = timedelta(minutes=grace_minutes)
     cutoff_time = now - grace_period
     
-    # Find planned sessions that have passed their grace period
     # Status precedence: completed > missed > planned
     # Note: If locked field exists, we should exclude locked sessions
     filters = [
-        StudySession.user_id == user_id,
         StudySession.status == SessionStatus.planned,
         StudySession.end_time <= cutoff_time
     ]
@@ -36,12 +25,80 @@ def mark_missed_sessions(user_id, grace_minutes=30):
     if hasattr(StudySession, 'locked'):
         filters.append(StudySession.locked == False)
     
-    missed_sessions = StudySession.query.filter(and_(*filters)).all()
+    return StudySession.query.filter(and_(*filters))
+
+
+def _mark_as_missed(query):
+    """Flip every session matched by the query to 'missed' in one UPDATE."""
+    count = query.update(
+        {StudySession.status: SessionStatus.missed},
+        synchronize_session=False
+    )
+    
+    if count > 0:
+        db.session.commit()
+    
+    return count
+
+
+def mark_missed_sessions(user_id, grace_minutes=30):
+    """
+    Mark sessions as 'missed' if end_time + grace period has passed.
+    
+    Args:
+        user_id: The user ID to check sessions for
+        grace_minutes: Minutes of grace period after session end (default: 30)
+    
+    Returns:
+        int: Number of sessions marked as missed
+    """
+    query = _overdue_planned_sessions(grace_minutes).filter(
+        StudySession.user_id == user_id
+    )
+    return _mark_as_missed(query)
+
+
+def mark_missed_sessions_all(grace_minutes=30, user_ids=None):
+    """
+    Mark overdue sessions as 'missed' for every user, honouring each user's grace period.
+    
+    Intended for cron/maintenance runs. Users are grouped by grace period, so
+    this issues one UPDATE per distinct grace value rather than one per user.
+    
+    Args:
+        grace_minutes: Grace period for users without one set (default: 30)
+        user_ids: Optional iterable of user IDs to restrict the update to
+    
+    Returns:
+        int: Number of sessions marked as missed
+    """
+    # Same rule as the per-user job: an unset or zero grace period means the default
+    custom_grace = and_(
+        StudyPreference.grace_minutes.isnot(None),
+        StudyPreference.grace_minutes != 0,
+        StudyPreference.grace_minutes != grace_minutes
+    )
+    custom_values = db.session.scalars(
+        select(StudyPreference.grace_minutes).where(custom_grace).distinct()
+    ).all()
+    
+    groups = [(grace_minutes, StudySession.user_id.notin_(
+        select(StudyPreference.user_id).where(custom_grace)
+    ))]
+    for user_grace in custom_values:
+        groups.append((user_grace, StudySession.user_id.in_(
+            select(StudyPreference.user_id).where(StudyPreference.grace_minutes == user_grace)
+        )))
     
     count = 0
-    for session in missed_sessions:
-        session.status = SessionStatus.missed
-        count += 1
+    for user_grace, users_filter in groups:
+        query = _overdue_planned_sessions(user_grace).filter(users_filter)
+        if user_ids is not None:
+            query = query.filter(StudySession.user_id.in_(list(user_ids)))
+        count += query.update(
+            {StudySession.status: SessionStatus.missed},
+            synchronize_session=False
+        )
     
     if count > 0:
         db.session.commit()
@@ -49,6 +106,16 @@ def mark_missed_sessions(user_id, grace_minutes=30):
     return count
 
 
+def _duration_minutes_expr():
+    """SQL expression for a session's planned duration in minutes.
+    
+    SQLite has no interval type, so fall back to julianday arithmetic there.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        return (func.julianday(StudySession.end_time) - func.julianday(StudySession.start_time)) * 1440
+    return func.extract('epoch', StudySession.end_time - StudySession.start_time) / 60
+
+
 def get_missed_sessions_summary(user_id):
     """
     Get summary of missed sessions for a user.
@@ -63,33 +130,37 @@ def get_missed_sessions_summary(user_id):
             'by_subject': {subject_id: {'name': str, 'minutes': float, 'count': int}}
         }
     """
-    missed_sessions = StudySession.query.filter(
+    rows = db.session.query(
+        StudySession.subject_id,
+        Subject.name,
+        func.sum(_duration_minutes_expr()),
+        func.count(StudySession.id)
+    ).outerjoin(
+        Subject, Subject.id == StudySession.subject_id
+    ).filter(
         and_(
             StudySession.user_id == user_id,
             StudySession.status == SessionStatus.missed
         )
+    ).group_by(
+        StudySession.subject_id, Subject.name
     ).all()
     
     summary = {
-        'count': len(missed_sessions),
+        'count': 0,
         'total_minutes': 0,
         'by_subject': {}
     }
     
-    for session in missed_sessions:
-        minutes = session.duration_minutes()
+    for subject_id, name, minutes, count in rows:
+        minutes = round(float(minutes or 0), 2)  # julianday math leaves float noise
+        summary['count'] += count
         summary['total_minutes'] += minutes
-        
-        subject_id = session.subject_id
-        if subject_id not in summary['by_subject']:
-            summary['by_subject'][subject_id] = {
-                'name': session.subject.name if session.subject else 'Unknown',
-                'minutes': 0,
-                'count': 0
-            }
-        
-        summary['by_subject'][subject_id]['minutes'] += minutes
-        summary['by_subject'][subject_id]['count'] += 1
+        summary['by_subject'][subject_id] = {
+            'name': name or 'Unknown',
+            'minutes': minutes,
+            'count': count
+        }
     
     return summary
 
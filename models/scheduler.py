@@ -1,10 +1,18 @@
+import bisect
 import datetime
-import json
+import heapq
+import itertools
 import math
-import random
+import re
 from collections import defaultdict
 from typing import List, Dict, Tuple, Any, Optional
 
+from sqlalchemy import insert
+
+from models.database import (
+    ClassBlock, SessionStatus, SessionType, StudySession, Task, UserConstraint
+)
+
 
 def _separate_capped_subjects(weights: Dict[int, float], 
                              total_hours: int, 
@@ -36,25 +44,23 @@ def _allocate_by_largest_remainder(uncapped_subjects: Dict[int, float],
         return {}
     
     uncapped_total_weight = sum(uncapped_subjects.values())
-    exact_allocations = {
-        sid: (weight / uncapped_total_weight) * remaining_hours if uncapped_total_weight > 0 else 0
-        for sid, weight in uncapped_subjects.items()
-    }
-    
-    allocation = {sid: int(exact) for sid, exact in exact_allocations.items()}
-    remainders = {sid: exact - int(exact) for sid, exact in exact_allocations.items()}
     
-    allocated_so_far = sum(allocation.values())
-    still_remaining = int(remaining_hours - allocated_so_far)
+    # One pass: whole hours and fractional remainder per subject
+    allocation = {}
+    remainders = {}
+    for sid, weight in uncapped_subjects.items():
+        exact = (weight / uncapped_total_weight) * remaining_hours if uncapped_total_weight > 0 else 0
+        whole = int(exact)
+        allocation[sid] = whole
+        remainders[sid] = exact - whole
     
-    sorted_by_remainder = sorted(
-        remainders.items(),
-        key=lambda x: (x[1], uncapped_subjects[x[0]]),
-        reverse=True
-    )
+    still_remaining = int(remaining_hours - sum(allocation.values()))
     
-    for i in range(min(still_remaining, len(sorted_by_remainder))):
-        subject_id = sorted_by_remainder[i][0]
+    # Only the top `still_remaining` remainders matter, so avoid sorting them all
+    for subject_id in heapq.nlargest(
+        still_remaining, remainders,
+        key=lambda sid: (remainders[sid], uncapped_subjects[sid])
+    ):
         allocation[subject_id] += 1
     
     return allocation
@@ -119,6 +125,115 @@ def allocate_hours(weights: Dict[int, float],
     return allocation
 
 
+# Session types suggested by keywords in a task's title and description, in
+# precedence order; each alternation is one regex scan (plain substrings)
+_SESSION_TYPE_KEYWORDS = (
+    ('practice', re.compile('practice|exercise|problem set|drill')),
+    ('review', re.compile('review|study|prepare|exam|test|quiz')),
+    ('learn', re.compile('learn|read|chapter|lecture')),
+)
+
+
+# Session type enum members by name, for the names _classify_task_text returns
+_SESSION_TYPES_BY_NAME = {session_type.name: session_type for session_type in SessionType}
+
+
+def _classify_task_text(title: str, description: str) -> str:
+    """Suggest a session type name from task text, 'assignment' if no keyword matches."""
+    combined_text = (title + ' ' + description).lower()
+    for session_type, keywords in _SESSION_TYPE_KEYWORDS:
+        if keywords.search(combined_text):
+            return session_type
+    return 'assignment'
+
+
+def _build_interval_index(intervals) -> Tuple[List[Any], List[Any]]:
+    """Index (start, end) intervals for point lookups with _interval_index_covers.
+    
+    Returns the sorted starts and, for each position, the latest end seen so far,
+    so overlapping intervals need no special handling.
+    """
+    intervals = sorted(intervals)
+    starts = [start for start, _ in intervals]
+    max_ends = list(itertools.accumulate((end for _, end in intervals), max))
+    return starts, max_ends
+
+
+def _interval_index_covers(index: Tuple[List[Any], List[Any]], value) -> bool:
+    """True if some indexed interval satisfies start <= value < end."""
+    starts, max_ends = index
+    position = bisect.bisect_right(starts, value)
+    return position > 0 and max_ends[position - 1] > value
+
+
+def _as_naive_utc(value: datetime.datetime) -> datetime.datetime:
+    """Normalize a datetime to naive UTC, the form study session times are stored in."""
+    if value.tzinfo is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+_MINUTES_PER_DAY = 24 * 60
+
+# Hour ranges (inclusive start and end hours) for each time of day
+_TIME_OF_DAY_RANGES = {
+    "morning": (5, 11),    # 5:00 AM - 11:59 AM
+    "afternoon": (12, 16), # 12:00 PM - 4:59 PM
+    "evening": (17, 21),   # 5:00 PM - 9:59 PM
+    "night": (22, 4)       # 10:00 PM - 4:59 AM
+}
+
+# Exam proximity bonus: the first bound >= days-to-exam picks the weight
+# (past or today, within a week, two weeks, a month, further out)
+_EXAM_DAY_BOUNDS = (0, 7, 14, 30)
+_EXAM_WEIGHTS = (0, 10, 5, 2, 0)
+
+# Task deadline urgency, picked the same way from days-to-deadline. Values are
+# high enough to override subject priority (overdue, today, tomorrow, within
+# three days, within a week, later)
+_DEADLINE_DAY_BOUNDS = (-1, 0, 1, 3, 7)
+_DEADLINE_URGENCIES = (100, 90, 50, 25, 10, 0)
+
+# Task suggestion deadline points, picked the same way (today, tomorrow,
+# within three days, this week, within two weeks, later)
+_SUGGESTION_DAY_BOUNDS = (0, 1, 3, 7, 14)
+_SUGGESTION_DEADLINE_POINTS = (50, 45, 35, 25, 15, 5)
+_UTC_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _minute_of_day(value) -> float:
+    """Minutes since midnight of a time or datetime, keeping any seconds as a fraction."""
+    return value.hour * 60 + value.minute + (value.second + value.microsecond / 1e6) / 60
+
+
+def _utc_minutes(value: datetime.datetime) -> float:
+    """Minutes since the Unix epoch of a datetime, read as UTC when naive."""
+    return (_as_naive_utc(value) - _UTC_EPOCH).total_seconds() / 60
+
+
+def _blocked_starts(booked_slots: int, span: int) -> int:
+    """Mask of the slot bits where a block of ``span`` (a run of low bits) would
+    overlap a booked slot.
+    
+    ORs the booked mask with shifted copies of itself, doubling the covered
+    width each step, so the cost grows with log(span length) rather than with
+    the number of slots in the day.
+    """
+    length = span.bit_length()
+    blocked = booked_slots
+    covered = 1
+    while covered < length:
+        step = min(covered, length - covered)
+        blocked |= blocked >> step
+        covered += step
+    return blocked
+
+
+def _lowest_bit(mask: int) -> int:
+    """Index of the lowest set bit of a non-zero mask."""
+    return (mask & -mask).bit_length() - 1
+
+
 class StudyScheduler:
     """Advanced study scheduler that creates optimized study plans based on
     multiple factors including subject priority, workload, difficulty,
@@ -150,9 +265,9 @@ class StudyScheduler:
         
         # Get preferred study times
         try:
-            self.preferred_times = json.loads(user.preferred_study_times)
-        except Exception:
-            # Default preferences
+            self.preferred_times = user.get_preferred_times()
+        except (TypeError, ValueError, AttributeError):
+            # Missing or malformed JSON: default preferences
             self.preferred_times = {
                 "morning": False,
                 "afternoon": False,
@@ -164,12 +279,62 @@ class StudyScheduler:
         # over-assign the same task beyond its estimated workload
         self._task_original_minutes: Dict[int, float] = {}
         self._task_remaining_minutes: Dict[int, float] = {}
+        # Keyword-based session type per task id, see _task_session_type
+        self._task_session_types: Dict[int, Optional[str]] = {}
+        # Incomplete tasks grouped by subject, loaded on first use
+        self._tasks_by_subject: Optional[Dict[int, List[Any]]] = None
+        # Task estimates and deadline index derived from those tasks, built on first use
+        self._task_workload: Optional[Dict[int, Tuple[int, List[datetime.date], List[int]]]] = None
+        self._dated_tasks: Optional[Tuple[List[datetime.date], List[Tuple[datetime.date, int, int, Any, int]]]] = None
+        # Subject weights and workload caps for this run, computed on first use
+        self._subject_weights: Optional[Dict[int, float]] = None
+        self._workload_caps: Optional[Dict[int, float]] = None
+        # Blocked-time indexes for _is_time_blocked_by_constraints, loaded on first use
+        self._weekly_blocks: Optional[Dict[int, Tuple[List[Any], List[Any]]]] = None
+        self._locked_sessions: Optional[Tuple[List[Any], List[Any]]] = None
+        # Weekly blocks per weekday as slot bitmasks, see _weekly_blocked_slots
+        self._weekly_block_masks: Dict[int, int] = {}
+        
+        # Resolve preferences once; they are read on every slot of every day
+        self._session_minutes = self._read_preference('preferred_session_length', 60)
+        self._break_minutes = self._read_preference('break_duration', 15)
+        self._max_consecutive = self._read_preference('max_consecutive_hours', 2)
+        self._weekend_study = self._read_preference('weekend_study', True)
+        self._days_per_week = self._read_preference('days_per_week', 5)
+        self._slot_minutes = self._compute_time_slot_minutes()
+        self._slot_template = self._build_slot_template()
+        
+        # Subject lookups by id; name and color are resolved once for session dicts
+        self._subject_map = {subject.id: subject for subject in subjects}
+        # Subject ids in the caller's order, for loops that need nothing else
+        self._subject_ids = [subject.id for subject in subjects]
+        self._subject_labels = {
+            subject.id: (subject.name, getattr(subject, 'color', "#3498db"))
+            for subject in subjects
+        }
+        # Sort key for "highest priority first" orderings, reused every day
+        self._priority_sort_key = {subject.id: -subject.priority for subject in subjects}
+        # Priority/difficulty part of each subject's weight (see calculate_subject_weights)
+        self._base_weights = {
+            subject.id: subject.priority * 2 + (getattr(subject, 'difficulty', None) or 0)
+            for subject in subjects
+        }
+        # Exam day per subject (None when no exam is set), read by _get_exam_weight
+        self._exam_days = {}
+        for subject in subjects:
+            exam_date = getattr(subject, 'exam_date', None)
+            self._exam_days[subject.id] = exam_date.date() if exam_date else None
     
-    def _get_time_slot_minutes(self) -> int:
+    def _read_preference(self, name: str, default):
+        """Read a study preference attribute, falling back to default."""
+        if self.study_preference and hasattr(self.study_preference, name):
+            return getattr(self.study_preference, name)
+        return default
+    
+    def _compute_time_slot_minutes(self) -> int:
         """Derive the base granularity (in minutes) for scheduling slots."""
-        session_minutes = int(self.get_session_length()) or 60
-        break_pref = self.get_break_duration()
-        break_minutes = int(break_pref) if break_pref else 0
+        session_minutes = int(self._session_minutes) or 60
+        break_minutes = int(self._break_minutes) if self._break_minutes else 0
         buffer_minutes = 30  # subject transition buffer
 
         slot_minutes = session_minutes
@@ -188,33 +353,22 @@ class StudyScheduler:
     
     def get_time_of_day_ranges(self) -> Dict[str, Tuple[int, int]]:
         """Define the hour ranges for different times of day."""
-        return {
-            "morning": (5, 11),    # 5:00 AM - 11:59 AM
-            "afternoon": (12, 16), # 12:00 PM - 4:59 PM
-            "evening": (17, 21),   # 5:00 PM - 9:59 PM
-            "night": (22, 4)       # 10:00 PM - 4:59 AM
-        }
+        return dict(_TIME_OF_DAY_RANGES)
     
-    def get_available_hours(self, date: datetime.datetime) -> List[datetime.datetime]:
-        """Get the start times (per slot) that the user prefers to study."""
-        slot_minutes = self._get_time_slot_minutes()
-        available_slots: List[datetime.datetime] = []
-        time_ranges = self.get_time_of_day_ranges()
+    def _build_slot_template(self) -> List[datetime.timedelta]:
+        """Build the sorted slot starts within the preferred times, as offsets from midnight.
         
-        # Check if we should include weekend study
-        is_weekend = date.weekday() >= 5
-        if is_weekend and hasattr(self.study_preference, 'weekend_study'):
-            if not self.study_preference.weekend_study:
-                return []
+        The template does not depend on the date, so it is computed once and
+        added onto each day's midnight by get_available_hours.
+        """
+        slot_minutes = self._slot_minutes
+        time_ranges = _TIME_OF_DAY_RANGES
+        slot_starts = set()
         
         def _extend_range(start_hour: int, end_hour: int):
-            start_time = date.replace(hour=start_hour, minute=0, second=0, microsecond=0)
-            end_time = date.replace(hour=end_hour, minute=0, second=0, microsecond=0)
-            current = start_time
-            while current <= end_time:
-                available_slots.append(current)
-                current += datetime.timedelta(minutes=slot_minutes)
-
+            for minute in range(start_hour * 60, end_hour * 60 + 1, slot_minutes):
+                slot_starts.add(minute)
+        
         for time_of_day, is_preferred in self.preferred_times.items():
             if not is_preferred:
                 continue
@@ -224,116 +378,219 @@ class StudyScheduler:
             else:
                 _extend_range(start_hour, 23)
                 _extend_range(0, end_hour)
-
-        # Remove duplicates while preserving order
-        # Preserve chronological order while removing duplicates
-        seen = set()
-        ordered_slots = []
-        for slot in sorted(available_slots):
-            key = (slot.hour, slot.minute)
-            if key in seen:
-                continue
-            seen.add(key)
-            ordered_slots.append(slot)
-
-        ordered_slots.sort()
-        return ordered_slots
-    
-    def _is_time_blocked_by_constraints(self, check_datetime: datetime.datetime) -> bool:
-        """Check if a specific time is blocked by user constraints, class blocks, or locked sessions.
         
-        Args:
-            check_datetime: The datetime to check
-            
-        Returns:
-            True if time is blocked, False otherwise
-        """
-        from models.database import UserConstraint, ClassBlock, StudySession
+        return [datetime.timedelta(minutes=minute) for minute in sorted(slot_starts)]
+    
+    def get_available_hours(self, date: datetime.datetime) -> List[datetime.datetime]:
+        """Get the start times (per slot) that the user prefers to study."""
+        # Check if we should include weekend study
+        if date.weekday() >= 5 and not self._weekend_study:
+            return []
         
-        day_of_week = check_datetime.weekday()
-        check_time = check_datetime.time()
+        day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        return [day_start + offset for offset in self._slot_template]
+    
+    def _load_blocked_time(self):
+        """Prefetch hard constraints, class blocks and locked sessions in three queries.
         
-        # Check user constraints (work, activities, etc)
-        constraints = UserConstraint.query.filter_by(
-            user_id=self.user.id,
-            day_of_week=day_of_week
-        ).all()
+        Constraints and class blocks recur weekly, so they are indexed by weekday
+        with minute-of-day bounds. Locked sessions are indexed by minutes since the
+        epoch, limited to the days this scheduler can place sessions on.
+        """
+        weekly_intervals = defaultdict(list)
         
+        # User constraints (work, activities, etc) only block if they are hard
+        constraints = UserConstraint.query.filter_by(user_id=self.user.id, is_hard=True).all()
         for constraint in constraints:
-            # Only block if it's a hard constraint
-            if constraint.is_hard:
-                if constraint.start_time <= check_time < constraint.end_time:
-                    return True
-        
-        # Check class blocks (recurring classes)
-        class_blocks = ClassBlock.query.filter_by(
-            user_id=self.user.id,
-            day_of_week=day_of_week
-        ).all()
+            weekly_intervals[constraint.day_of_week].append(
+                (_minute_of_day(constraint.start_time), _minute_of_day(constraint.end_time))
+            )
+        
+        # Class blocks (recurring classes)
+        for class_block in ClassBlock.query.filter_by(user_id=self.user.id).all():
+            weekly_intervals[class_block.day_of_week].append(
+                (_minute_of_day(class_block.start_time), _minute_of_day(class_block.end_time))
+            )
         
-        for class_block in class_blocks:
-            if class_block.start_time <= check_time < class_block.end_time:
-                return True
+        self._weekly_blocks = {
+            day_of_week: _build_interval_index(intervals)
+            for day_of_week, intervals in weekly_intervals.items()
+        }
         
-        # Check locked sessions (user's manual edits to preserve)
-        # Query locked sessions that overlap with this datetime
+        # Locked sessions (user's manual edits to preserve); sessions can run a
+        # little past the last day, hence the extra day on the window
+        window_start = self.start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        window_end = self.end_date.replace(hour=0, minute=0, second=0, microsecond=0) + datetime.timedelta(days=2)
         locked_sessions = StudySession.query.filter(
             StudySession.user_id == self.user.id,
             StudySession.locked == True,
-            StudySession.start_time <= check_datetime,
-            StudySession.end_time > check_datetime
+            StudySession.end_time > window_start,
+            StudySession.start_time < window_end
         ).all()
+        self._locked_sessions = _build_interval_index(
+            (_utc_minutes(session.start_time), _utc_minutes(session.end_time))
+            for session in locked_sessions
+        )
+    
+    def _is_time_blocked_by_constraints(self, check_datetime: datetime.datetime) -> bool:
+        """Check if a specific time is blocked by user constraints, class blocks, or locked sessions.
+        
+        Args:
+            check_datetime: The datetime to check
+            
+        Returns:
+            True if time is blocked, False otherwise
+        """
+        if self._weekly_blocks is None:
+            self._load_blocked_time()
         
-        if locked_sessions:
+        weekly_blocks = self._weekly_blocks.get(check_datetime.weekday())
+        if weekly_blocks and _interval_index_covers(weekly_blocks, _minute_of_day(check_datetime)):
             return True
         
-        return False
+        return _interval_index_covers(self._locked_sessions, _utc_minutes(check_datetime))
     
     def _filter_blocked_hours(self, date: datetime.datetime, available_slots: List[datetime.datetime]) -> List[datetime.datetime]:
         """Filter out start times blocked by constraints or classes."""
         if not available_slots:
             return []
+        if self._weekly_blocks is None:
+            self._load_blocked_time()
 
-        session_minutes = self.get_session_length()
-        slot_minutes = self._get_time_slot_minutes()
+        # Every slot-sized step of the session must be free. Steps land on slot
+        # starts, so weekly blocks are a mask over the slot bits of this day and
+        # the next (for sessions running past midnight); locked sessions depend
+        # on the date and are checked per step, in integer minute offsets.
+        slot_minutes = self._slot_minutes
+        check_offsets = range(0, self._session_minutes, slot_minutes)
+        check_span = (1 << len(check_offsets)) - 1
+        weekday = date.weekday()
+        blocked_slots = (
+            self._weekly_blocked_slots(weekday)
+            | self._weekly_blocked_slots((weekday + 1) % 7) << (_MINUTES_PER_DAY // slot_minutes)
+        )
+        target_date = date.date()
+        locked_sessions = self._locked_sessions if self._locked_sessions[0] else None
         free_slots: List[datetime.datetime] = []
 
         for start_time in available_slots:
-            if start_time.date() != date.date():
-                continue
-            if self._is_time_blocked_by_constraints(start_time):
+            if start_time.date() != target_date:
                 continue
 
-            # Ensure the entire session fits without hitting a constraint boundary
-            end_time = start_time + datetime.timedelta(minutes=session_minutes)
-            check_time = start_time
-            blocked = False
-            while check_time < end_time:
-                if self._is_time_blocked_by_constraints(check_time):
-                    blocked = True
-                    break
-                check_time += datetime.timedelta(minutes=slot_minutes)
-
-            if not blocked:
-                free_slots.append(start_time)
+            slot_bit = (start_time.hour * 60 + start_time.minute) // slot_minutes
+            if (blocked_slots >> slot_bit) & check_span:
+                continue
+            if locked_sessions:
+                locked_start = _utc_minutes(start_time)
+                if any(_interval_index_covers(locked_sessions, locked_start + offset)
+                       for offset in check_offsets):
+                    continue
+            free_slots.append(start_time)
 
         return free_slots
     
+    def _weekly_blocked_slots(self, weekday: int) -> int:
+        """Bitmask of the slot starts on a weekday covered by hard constraints or classes.
+        
+        Bit ``i`` stands for the slot beginning at minute ``i * slot_minutes``,
+        as in the booked-slot masks. Computed once per weekday.
+        """
+        if weekday not in self._weekly_block_masks:
+            blocks = self._weekly_blocks.get(weekday)
+            mask = 0
+            if blocks:
+                slot_minutes = self._slot_minutes
+                for slot_bit in range(_MINUTES_PER_DAY // slot_minutes):
+                    if _interval_index_covers(blocks, slot_bit * slot_minutes):
+                        mask |= 1 << slot_bit
+            self._weekly_block_masks[weekday] = mask
+        return self._weekly_block_masks[weekday]
+    
+    def _get_incomplete_tasks_by_subject(self) -> Dict[int, List[Any]]:
+        """Load all incomplete tasks for the scheduler's subjects in one query.
+        
+        Returns:
+            Dict mapping subject_id to its incomplete tasks (missing subjects have none)
+        """
+        if self._tasks_by_subject is None:
+            tasks_by_subject = defaultdict(list)
+            subject_ids = self._subject_ids
+            if subject_ids:
+                # user_id leads idx_user_subject, so the lookup stays on the index
+                tasks = Task.query.filter(
+                    Task.user_id == self.user.id,
+                    Task.subject_id.in_(subject_ids),
+                    Task.completed == False
+                ).order_by(Task.id).all()
+                for task in tasks:
+                    tasks_by_subject[task.subject_id].append(task)
+            self._tasks_by_subject = tasks_by_subject
+        return self._tasks_by_subject
+    
+    def _get_dated_tasks(self) -> Tuple[List[datetime.date], List[Tuple[datetime.date, int, int, Any, int]]]:
+        """Incomplete tasks that have a deadline, sorted by deadline date, built once.
+        
+        Returns:
+            Tuple of (deadline dates, rows) in the same order, where each row is
+            (deadline date, position, subject_id, task, estimated minutes).
+            Position is the task's place in subject-then-task order, and tasks
+            without an estimate count as one session.
+        """
+        if self._dated_tasks is None:
+            session_minutes = self._session_minutes
+            tasks_by_subject = self._get_incomplete_tasks_by_subject()
+            rows = []
+            for subject_id in self._subject_ids:
+                for task in tasks_by_subject.get(subject_id, []):
+                    if not task.deadline:
+                        continue
+                    estimate = task.estimated_time if task.estimated_time and task.estimated_time > 0 else session_minutes
+                    rows.append((task.deadline.date(), len(rows), subject_id, task, estimate))
+            rows.sort(key=lambda row: row[:2])
+            self._dated_tasks = ([row[0] for row in rows], rows)
+        return self._dated_tasks
+    
+    def _get_task_workload(self) -> Dict[int, Tuple[int, List[datetime.date], List[int]]]:
+        """Summarize each subject's incomplete task estimates once.
+        
+        Tasks without an estimate count as one full session.
+        
+        Returns:
+            Dict mapping subject_id to (total minutes, sorted deadline dates,
+            running minutes along those deadlines), so the work due by any date
+            is a single bisect. Subjects without incomplete tasks are absent.
+        """
+        if self._task_workload is None:
+            session_minutes = self._session_minutes
+            if session_minutes <= 0:
+                session_minutes = 60
+            
+            workload = {}
+            for subject_id, tasks in self._get_incomplete_tasks_by_subject().items():
+                total_minutes = 0
+                dated_estimates = []
+                for task in tasks:
+                    estimate = task.estimated_time if task.estimated_time and task.estimated_time > 0 else session_minutes
+                    total_minutes += estimate
+                    if task.deadline:
+                        dated_estimates.append((task.deadline.date(), estimate))
+                dated_estimates.sort(key=lambda row: row[0])
+                workload[subject_id] = (
+                    total_minutes,
+                    [deadline for deadline, _ in dated_estimates],
+                    list(itertools.accumulate(estimate for _, estimate in dated_estimates))
+                )
+            self._task_workload = workload
+        return self._task_workload
+    
     def _get_exam_weight(self, subject, today) -> float:
         """Calculate weight bonus based on exam proximity."""
-        if not hasattr(subject, 'exam_date') or not subject.exam_date:
+        exam_day = self._exam_days.get(subject.id)
+        if exam_day is None:
             return 0
         
-        days_to_exam = (subject.exam_date.date() - today).days
-        if days_to_exam <= 0:
-            return 0
-        if days_to_exam <= 7:
-            return 10
-        if days_to_exam <= 14:
-            return 5
-        if days_to_exam <= 30:
-            return 2
-        return 0
+        days_to_exam = (exam_day - today).days
+        return _EXAM_WEIGHTS[bisect.bisect_left(_EXAM_DAY_BOUNDS, days_to_exam)]
     
     def _get_task_urgency_weight(self, subject, today) -> float:
         """Calculate weight bonus based on task deadline proximity.
@@ -348,13 +605,8 @@ class StudyScheduler:
         Returns:
             Float weight bonus (0-100), higher for urgent tasks to override subject priority
         """
-        from models.database import Task
-        
         # Get incomplete tasks for this subject
-        tasks = Task.query.filter_by(
-            subject_id=subject.id,
-            completed=False
-        ).all()
+        tasks = self._get_incomplete_tasks_by_subject().get(subject.id, [])
         
         if not tasks:
             return 0
@@ -366,22 +618,11 @@ class StudyScheduler:
             
             days_to_deadline = (task.deadline.date() - today).days
             
-            # Calculate base urgency - MUCH HIGHER values to override subject priority
-            if days_to_deadline < 0:
-                urgency = 100  # Overdue! CRITICAL - must be scheduled!
-            elif days_to_deadline == 0:
-                urgency = 90   # Due TODAY! URGENT - must be scheduled!
-            elif days_to_deadline == 1:
-                urgency = 50   # Due TOMORROW! HIGH
-            elif days_to_deadline <= 3:
-                urgency = 25   # Due very soon
-            elif days_to_deadline <= 7:
-                urgency = 10   # Due this week
-            else:
-                urgency = 0
+            # Base urgency - MUCH HIGHER values to override subject priority
+            urgency = _DEADLINE_URGENCIES[bisect.bisect_left(_DEADLINE_DAY_BOUNDS, days_to_deadline)]
             
             # Factor in task priority (1-5 scale)
-            if hasattr(task, 'priority') and task.priority:
+            if task.priority:
                 urgency *= (task.priority / 3.0)
             
             # Track the most urgent task
@@ -392,17 +633,19 @@ class StudyScheduler:
     def calculate_subject_weights(self) -> Dict[int, float]:
         """Calculate subject weights based on priority, workload, difficulty,
         proximity to exam date, and task deadline urgency.
+        
+        Weights are computed once per scheduler; callers get their own copy.
         """
+        if self._subject_weights is not None:
+            return dict(self._subject_weights)
+        
         weights = {}
         today = datetime.datetime.now(datetime.timezone.utc).date()
         
         for subject in self.subjects:
-            # Base weight from priority (scale 1-5)
-            weight = subject.priority * 2
-            
-            # Add weight based on difficulty (more difficult = higher weight)
-            if hasattr(subject, 'difficulty') and subject.difficulty:
-                weight += subject.difficulty
+            # Base weight from priority (scale 1-5) plus difficulty
+            # (more difficult = higher weight), resolved once in __init__
+            weight = self._base_weights[subject.id]
             
             # Add weight based on exam proximity
             weight += self._get_exam_weight(subject, today)
@@ -412,7 +655,8 @@ class StudyScheduler:
             
             weights[subject.id] = weight
         
-        return weights
+        self._subject_weights = weights
+        return dict(weights)
     
     def calculate_subject_allocation(self) -> Dict[int, int]:
         """Calculate how many hours to allocate to each subject based on
@@ -433,7 +677,7 @@ class StudyScheduler:
         allocation = allocate_hours(weights, total_study_hours, caps)
         
         # Ensure allocation covers urgent task workload due within the schedule range
-        session_minutes = self.get_session_length()
+        session_minutes = self._session_minutes
         if session_minutes <= 0:
             session_minutes = 60
 
@@ -453,120 +697,61 @@ class StudyScheduler:
         For example, if a subject only has 2 hours of tasks left, don't allocate 5 hours.
         
         Returns:
-            Dict mapping subject_id to max hours (float)
+            Dict mapping subject_id to max hours (float), shared for the run
         """
-        from models.database import Task
+        if self._workload_caps is not None:
+            return self._workload_caps
         
         caps = {}
+        workload = self._get_task_workload()
         
-        session_minutes = self.get_session_length()
+        session_minutes = self._session_minutes
         # Avoid division by zero – if preferences somehow set 0, default to 60
         if session_minutes <= 0:
             session_minutes = 60
         session_hours = session_minutes / 60.0
 
-        for subject in self.subjects:
-            # Get all incomplete tasks for this subject
-            incomplete_tasks = Task.query.filter_by(
-                subject_id=subject.id,
-                completed=False
-            ).all()
-            
-            # Sum estimated time for incomplete tasks
-            total_minutes = 0
-            for task in incomplete_tasks:
-                if task.estimated_time and task.estimated_time > 0:
-                    total_minutes += task.estimated_time
-                else:
-                    # If no estimate provided, assume one full session
-                    total_minutes += session_minutes
+        for subject_id in self._subject_ids:
+            # Estimated time of incomplete tasks (unestimated ones count as a session)
+            total_minutes = workload[subject_id][0] if subject_id in workload else 0
             
             if total_minutes > 0:
                 # Round up to the next full session so we never cap below 1
                 sessions_needed = math.ceil(total_minutes / session_minutes)
-                caps[subject.id] = sessions_needed * session_hours
+                caps[subject_id] = sessions_needed * session_hours
             # If no tasks or no estimates, don't cap (use workload from subject)
         
+        self._workload_caps = caps
         return caps
     
     def get_session_length(self) -> int:
         """Get the preferred session length in minutes."""
-        if (self.study_preference and 
-                hasattr(self.study_preference, 'preferred_session_length')):
-            return self.study_preference.preferred_session_length
-        return 60  # Default to 1 hour
+        return self._session_minutes
     
     def get_break_duration(self) -> int:
         """Get the preferred break duration in minutes."""
-        if (self.study_preference and 
-                hasattr(self.study_preference, 'break_duration')):
-            return self.study_preference.break_duration
-        return 15  # Default to 15 minutes
+        return self._break_minutes
     
     def get_max_consecutive_hours(self) -> int:
         """Get the maximum number of consecutive study hours."""
-        if (self.study_preference and 
-                hasattr(self.study_preference, 'max_consecutive_hours')):
-            return self.study_preference.max_consecutive_hours
-        return 2  # Default to 2 hours
+        return self._max_consecutive
     
-    def _build_booked_slots(self, scheduled_sessions, date):
-        """Build set of booked slots using the scheduler's time granularity."""
-        slot_minutes = self._get_time_slot_minutes()
-        booked_slots = set()
-        for session in scheduled_sessions:
-            if session['start_time'].date() == date.date():
-                current = session['start_time']
-                while current < session['end_time']:
-                    booked_slots.add((current.hour, current.minute))
-                    current += datetime.timedelta(minutes=slot_minutes)
-        return booked_slots
-    
-    def _mark_time_as_booked(self, booked_slots, start_time, end_time):
-        """Mark time range as booked using the scheduler's time granularity."""
-        slot_minutes = self._get_time_slot_minutes()
-        mark_time = start_time
-        while mark_time < end_time:
-            booked_slots.add((mark_time.hour, mark_time.minute))
-            mark_time += datetime.timedelta(minutes=slot_minutes)
-    
-    def _is_slot_available(self, booked_slots, start_time, duration_minutes):
-        """Check if a time slot is available."""
-        slot_minutes = self._get_time_slot_minutes()
-        end_time = start_time + datetime.timedelta(minutes=duration_minutes)
-        check_time = start_time
-        while check_time < end_time:
-            if (check_time.hour, check_time.minute) in booked_slots:
-                return False
-            check_time += datetime.timedelta(minutes=slot_minutes)
-        return True
-    
-    def _can_schedule_subject(self, subject_id, hour, remaining_allocation, 
-                             consecutive_sessions, max_consecutive, subject_time_tracking):
-        """Check if a subject can be scheduled at this time."""
-        if remaining_allocation[subject_id] <= 0:
-            return False
-        if consecutive_sessions[subject_id] >= max_consecutive:
-            return False
-        if subject_time_tracking and subject_id in subject_time_tracking:
-            if subject_time_tracking[subject_id].get(hour, 0) >= 2:
-                return False
-        return True
-    
-    def _create_session_dict(self, subject_id, subject_map, start_time, end_time):
-        """Create a session dictionary."""
-        subject = subject_map[subject_id]
-        return {
-            'subject_id': subject_id,
-            'subject_name': subject.name,
-            'start_time': start_time,
-            'end_time': end_time,
-            'color': subject.color if hasattr(subject, 'color') else "#3498db"
-        }
+    def _slot_mask(self, start_time: datetime.datetime, duration_minutes: float) -> int:
+        """Bitmask of the day's slots overlapped by a block starting at start_time.
+        
+        Bit ``i`` stands for the slot beginning at minute ``i * slot_minutes``.
+        """
+        slot_minutes = self._slot_minutes
+        start_minute = start_time.hour * 60 + start_time.minute
+        first_slot = start_minute // slot_minutes
+        end_slot = math.ceil((start_minute + duration_minutes) / slot_minutes)
+        if end_slot <= first_slot:
+            return 0
+        return ((1 << (end_slot - first_slot)) - 1) << first_slot
     
-    def _build_booked_slots(self, scheduled_sessions: List[Dict], date: datetime.datetime) -> set:
-        """Build a set of booked time slots from existing sessions."""
-        booked = set()
+    def _build_booked_slots(self, scheduled_sessions: List[Dict], date: datetime.datetime) -> int:
+        """Build a bitmask of booked slots on the given date from existing sessions."""
+        booked = 0
         target_date = date.date()
         
         for session in scheduled_sessions:
@@ -580,23 +765,79 @@ class StudyScheduler:
             if start.date() != target_date:
                 continue
             
-            # Mark each minute as booked
-            current = start
-            while current < end:
-                booked.add(current)
-                current += datetime.timedelta(minutes=1)
+            booked |= self._slot_mask(start, (end - start).total_seconds() / 60)
         
         return booked
     
+    def _mark_time_as_booked(self, booked_slots: int, start_time, end_time) -> int:
+        """Return the booked-slot mask with the given time range marked."""
+        return booked_slots | self._slot_mask(start_time, (end_time - start_time).total_seconds() / 60)
+    
+    def _is_slot_available(self, booked_slots: int, start_time, duration_minutes) -> bool:
+        """Check if a time slot is available."""
+        return not booked_slots & self._slot_mask(start_time, duration_minutes)
+    
+    def _slot_span(self, duration_minutes: float) -> int:
+        """Run of low bits covering duration_minutes from an on-grid slot start."""
+        return (1 << math.ceil(duration_minutes / self._slot_minutes)) - 1
+    
+    def _create_session_dict(self, subject_id, start_time, end_time, task=None):
+        """Create a session dictionary, optionally tied to a task."""
+        name, color = self._subject_labels[subject_id]
+        session = {
+            'subject_id': subject_id,
+            'subject_name': name,
+            'start_time': start_time,
+            'end_time': end_time
+        }
+        if task is not None:
+            session['task_id'] = task.id
+            session['task_title'] = task.title
+        session['color'] = color
+        return session
+    
+    def _book_session(self, subject_id: int, slot_bit: int, slot_start: datetime.datetime,
+                      minutes: int, booked_slots: int, booked_span: int,
+                      task=None) -> Tuple[Dict, int]:
+        """Create a session at a slot and book it together with the break after it.
+        
+        booked_span is the run of slots the session and its break take up.
+        Returns the session dict and the updated booked-slot mask.
+        """
+        slot_end = slot_start + datetime.timedelta(minutes=minutes)
+        session = self._create_session_dict(subject_id, slot_start, slot_end, task)
+        return session, booked_slots | booked_span << slot_bit
+    
+    def _fill_slots_with_subject(self, subject_id: int, slot_starts: Dict[int, datetime.datetime],
+                                 open_slots: int, booked_slots: int, remaining_minutes: int,
+                                 session_minutes: int, session_span: int,
+                                 booked_span: int) -> Tuple[List[Dict], int, int]:
+        """Fill the open slots in order with one subject's sessions until its time runs out.
+        
+        Equivalent to repeated first-fit for a single subject, since booking only
+        ever removes slots. Returns the sessions, the booked mask and the minutes left.
+        """
+        sessions = []
+        while open_slots and remaining_minutes > 0:
+            bit = _lowest_bit(open_slots)
+            open_slots &= open_slots - 1
+            if (booked_slots >> bit) & session_span:
+                continue
+            session, booked_slots = self._book_session(
+                subject_id, bit, slot_starts[bit], session_minutes, booked_slots, booked_span
+            )
+            sessions.append(session)
+            remaining_minutes -= session_minutes
+        return sessions, booked_slots, remaining_minutes
+    
     def _get_urgent_subjects_for_date(self, target_date: datetime.date) -> List[int]:
         """Get list of subject IDs with tasks due today or tomorrow, ordered by urgency."""
-        from models.database import Task
-        
         tomorrow = target_date + datetime.timedelta(days=1)
         urgent_subjects = []
+        tasks_by_subject = self._get_incomplete_tasks_by_subject()
         
         for subject in self.subjects:
-            tasks = Task.query.filter_by(subject_id=subject.id, completed=False).all()
+            tasks = tasks_by_subject.get(subject.id, [])
             for task in tasks:
                 if task.deadline and task.deadline.date() <= tomorrow:
                     if subject.id not in urgent_subjects:
@@ -605,190 +846,17 @@ class StudyScheduler:
         
         return urgent_subjects
     
-    def _schedule_subject_block(self, subject_id: int, subject_map: Dict, 
-                                remaining_allocation: Dict, available_slots: List,
-                                booked_slots: set, session_minutes: int, 
-                                break_minutes: int, max_consecutive_hours: int) -> List[Dict]:
-        """Schedule a block of sessions for one subject, keeping them together."""
-        if subject_id not in subject_map:
-            return []
-        
-        subject = subject_map[subject_id]
-        sessions_to_add = []
-        hours_to_schedule = remaining_allocation.get(subject_id, 0)
-        
-        if hours_to_schedule <= 0:
-            return []
-        
-        # Convert hours to number of sessions
-        sessions_needed = math.ceil(hours_to_schedule * 60 / session_minutes)
-        max_sessions = int(max_consecutive_hours * 60 / session_minutes)
-        sessions_to_schedule = min(sessions_needed, max_sessions)
-        
-        # Track initial allocation to check if we meet it
-        initial_hours = hours_to_schedule
-        
-        # Find consecutive available slots
-        for i, slot_start in enumerate(available_slots):
-            if len(sessions_to_add) >= sessions_to_schedule:
-                break
-            
-            # Check if this slot is available
-            if not self._is_slot_available(booked_slots, slot_start, session_minutes):
-                continue
-            
-            # Create session
-            session_end = slot_start + datetime.timedelta(minutes=session_minutes)
-            session = {
-                'subject_id': subject_id,
-                'subject_name': subject.name,
-                'start_time': slot_start,
-                'end_time': session_end,
-                'color': subject.color if hasattr(subject, 'color') else "#3498db"
-            }
-            
-            sessions_to_add.append(session)
-            
-            # Mark time as booked (session + break)
-            self._mark_time_as_booked(booked_slots, slot_start, session_end)
-            if break_minutes > 0 and len(sessions_to_add) < sessions_to_schedule:
-                break_end = session_end + datetime.timedelta(minutes=break_minutes)
-                self._mark_time_as_booked(booked_slots, session_end, break_end)
-            
-            # Update remaining allocation
-            hours_used = session_minutes / 60
-            remaining_allocation[subject_id] -= hours_used
-        
-        # Check if we couldn't schedule enough time for urgent tasks
-        hours_scheduled = len(sessions_to_add) * (session_minutes / 60)
-        if hours_scheduled < initial_hours * 0.5:  # Less than 50% of needed time
-            self.warnings.append({
-                'type': 'insufficient_time',
-                'subject': subject.name,
-                'needed_hours': initial_hours,
-                'scheduled_hours': hours_scheduled,
-                'message': f"Could only schedule {hours_scheduled:.1f} of {initial_hours:.1f} hours needed for {subject.name}"
-            })
-        
-        return sessions_to_add
-    
-    def _try_schedule_subject(self, current_dt, subject_rotation_queue, current_subject_index,
-                              remaining_allocation, consecutive_sessions, max_consecutive,
-                              subject_time_tracking, subject_map, session_minutes, booked_time_slots,
-                              existing_schedule):
-        """Try to schedule a subject at the given hour, respecting transition buffers."""
-        attempted_subjects = set()
-        slot_hour = current_dt.hour
-        
-        # Check if we need a buffer for subject transitions
-        needs_buffer, prev_subject_id = self._needs_subject_transition_buffer(
-            existing_schedule, current_dt, buffer_minutes=30
-        )
-        
-        while len(attempted_subjects) < len(subject_rotation_queue):
-            if current_subject_index >= len(subject_rotation_queue):
-                current_subject_index = 0
-            
-            subject_id = subject_rotation_queue[current_subject_index]
-            current_subject_index += 1
-            
-            if subject_id in attempted_subjects:
-                continue
-            
-            attempted_subjects.add(subject_id)
-            
-            # Skip if buffer is needed and this is a different subject
-            if needs_buffer and prev_subject_id is not None and subject_id != prev_subject_id:
-                continue
-            
-            if not self._can_schedule_subject(subject_id, slot_hour, remaining_allocation,
-                                             consecutive_sessions, max_consecutive, subject_time_tracking):
-                continue
-            
-            start_time = current_dt
-            end_time = start_time + datetime.timedelta(minutes=session_minutes)
-            
-            session = self._create_session_dict(subject_id, subject_map, start_time, end_time)
-            self._mark_time_as_booked(booked_time_slots, start_time, end_time)
-            
-            hours_used = session_minutes / 60
-            remaining_allocation[subject_id] -= hours_used
-            consecutive_sessions[subject_id] += hours_used
-            
-            if subject_time_tracking and subject_id in subject_time_tracking:
-                subject_time_tracking[subject_id][slot_hour] = subject_time_tracking[subject_id].get(slot_hour, 0) + 1
-            
-            return session, current_subject_index
-        
-        return None, current_subject_index
-    
-    def _initialize_schedule_data(self, date, subject_allocation, scheduled_sessions):
-        """Initialize data structures for daily scheduling."""
-        available_slots = self.get_available_hours(date)
-        if not available_slots:
-            return None, None, None, None, None
-        
-        # Filter out hours blocked by constraints and classes
-        available_slots = self._filter_blocked_hours(date, available_slots)
-        if not available_slots:
-            return None, None, None, None, None
-        
-        subject_map = {subject.id: subject for subject in self.subjects}
-        remaining_allocation = subject_allocation.copy()
-        
-        urgent_hours = getattr(self, '_current_day_urgent_hours', {})
-        subjects_by_priority = sorted(
-            [(subject_id, subject_map[subject_id])
-             for subject_id in remaining_allocation.keys()
-             if subject_id in subject_map],
-            key=lambda x: (
-                -urgent_hours.get(x[0], 0),
-                -subject_allocation.get(x[0], 0),
-                -x[1].priority,
-                x[1].exam_date if hasattr(x[1], 'exam_date') else datetime.datetime.max
-            )
-        )
-        
-        session_minutes = self.get_session_length()
-        booked_time_slots = self._build_booked_slots(scheduled_sessions, date)
-        available_slots = [slot for slot in available_slots if self._is_slot_available(
-            booked_time_slots, slot, session_minutes
-        )]
-        available_slots.sort()
-        
-        urgent_hours = getattr(self, '_current_day_urgent_hours', {})
-        urgent_queue: List[int] = []
-        normal_queue: List[int] = []
-
-        for sid, _ in subjects_by_priority:
-            remaining = remaining_allocation.get(sid, 0)
-            if remaining <= 0:
-                continue
-
-            repeats = max(1, math.ceil(remaining))
-            urgent_required = urgent_hours.get(sid, 0)
-
-            if urgent_required and urgent_required > 0:
-                urgent_repeats = min(repeats, math.ceil(urgent_required))
-                urgent_queue.extend([sid] * urgent_repeats)
-                leftover = repeats - urgent_repeats
-                if leftover > 0:
-                    normal_queue.extend([sid] * leftover)
-            else:
-                normal_queue.extend([sid] * repeats)
-
-        subject_rotation_queue = urgent_queue + normal_queue
-        
-        return subject_map, remaining_allocation, available_slots, subject_rotation_queue, booked_time_slots
-    
     def build_daily_schedule(self, 
                             date: datetime.datetime, 
                             subject_allocation: Dict[int, int],
-                            scheduled_sessions: List[Dict[str, Any]]
+                            scheduled_sessions: List[Dict[str, Any]],
+                            booked_slots: Optional[int] = None
                             ) -> List[Dict[str, Any]]:
-        """TASK-BASED: Schedule using actual tasks with variable lengths, smart distribution, and subject interleaving."""
-        from models.database import Task
+        """TASK-BASED: Schedule using actual tasks with variable lengths, smart distribution, and subject interleaving.
         
+        booked_slots is the day's booked-slot mask if the caller already tracks
+        it; otherwise it is built from scheduled_sessions.
+        """
         # Get available time slots
         available_slots = self.get_available_hours(date)
         if not available_slots:
@@ -798,67 +866,73 @@ class StudyScheduler:
         if not available_slots:
             return []
         
-        base_session_minutes = self.get_session_length()
-        break_minutes = self.get_break_duration() or 0
+        # Slots start on the slot grid, so each maps to its bit in the booked
+        # mask. open_slots holds the bits of slots still on offer: the loops
+        # below prune and pick from it with mask operations instead of
+        # rebuilding a list, and only look up start times for chosen slots.
+        slot_minutes = self._slot_minutes
+        slot_starts = {}
+        open_slots = 0
+        for slot in available_slots:
+            bit = (slot.hour * 60 + slot.minute) // slot_minutes
+            slot_starts[bit] = slot
+            open_slots |= 1 << bit
+        
+        base_session_minutes = self._session_minutes
+        break_minutes = max(self._break_minutes or 0, 0)
+        session_span = self._slot_span(base_session_minutes)
+        # A session and the break after it book one contiguous run of slots
+        session_and_break_span = self._slot_span(base_session_minutes + break_minutes)
         max_task_chunk = 120  # Split tasks >200 min into chunks of max 120 min
         
         # Build booked slots from existing schedule
-        booked_slots = self._build_booked_slots(scheduled_sessions, date)
+        if booked_slots is None:
+            booked_slots = self._build_booked_slots(scheduled_sessions, date)
         
-        subject_map = {s.id: s for s in self.subjects}
-        remaining_allocation = subject_allocation.copy()
+        # Remaining allocation in whole minutes, so '<= 0' checks are exact
+        remaining_allocation = {
+            sid: round(hours * 60) for sid, hours in subject_allocation.items()
+        }
         day_sessions = []
         target_date = date.date()
         tomorrow = target_date + datetime.timedelta(days=1)
         
         # PHASE 1: Get and prepare urgent tasks (due today or tomorrow, NOT past due date)
+        # Only tasks due today or tomorrow: tasks past their due date are not
+        # scheduled on later days, and later deadlines are not due yet
         urgent_tasks = []
-        for subject in self.subjects:
-            tasks = Task.query.filter_by(
-                subject_id=subject.id, 
-                completed=False,
-                user_id=self.user.id
-            ).all()
+        deadline_dates, dated_tasks = self._get_dated_tasks()
+        due_soon = dated_tasks[
+            bisect.bisect_left(deadline_dates, target_date):bisect.bisect_right(deadline_dates, tomorrow)
+        ]
+        # Back to subject-then-task order, so equal urgency scores keep it below
+        due_soon.sort(key=lambda row: row[1])
+        for task_deadline_date, _, subject_id, task, task_estimated in due_soon:
+            # Check if task is already fully scheduled
+            task_allocated = self.task_allocated_minutes.get(task.id, 0)
             
-            for task in tasks:
-                if not task.deadline:
-                    continue
-                    
-                task_deadline_date = task.deadline.date()
-                
-                # Only include tasks due today or tomorrow
-                # If task is past its due date (more than yesterday), don't schedule it
-                if task_deadline_date > tomorrow:
-                    continue  # Not due yet, skip
-                
-                # If task's deadline is in the past (before today), don't schedule it
-                # Tasks past their due date should not be scheduled in subsequent days
-                if task_deadline_date < target_date:
-                    continue  # Task is past due date, don't schedule in future days
-                
-                # Check if task is already fully scheduled
-                task_estimated = task.estimated_time if task.estimated_time and task.estimated_time > 0 else base_session_minutes
-                task_allocated = self.task_allocated_minutes.get(task.id, 0)
-                
-                # Skip if already fully allocated
-                if task_allocated >= task_estimated:
-                    continue  # Task already fully scheduled
-                
-                # Calculate priority score (deadline + task priority)
-                days_until_due = (task_deadline_date - target_date).days
-                urgency_score = 100 - (days_until_due * 10)  # Overdue gets 100+, today gets 100
-                if task.priority:
-                    urgency_score += task.priority * 5
-                
-                # Calculate remaining minutes needed
-                remaining_minutes = task_estimated - task_allocated
-                
-                urgent_tasks.append({
-                    'task': task,
-                    'subject_id': subject.id,
-                    'estimated_minutes': remaining_minutes,  # Use remaining minutes, not total
-                    'urgency_score': urgency_score
-                })
+            # Skip if already fully allocated
+            if task_allocated >= task_estimated:
+                continue  # Task already fully scheduled
+            
+            # Calculate priority score (deadline + task priority)
+            days_until_due = (task_deadline_date - target_date).days
+            urgency_score = 100 - (days_until_due * 10)  # Overdue gets 100+, today gets 100
+            if task.priority:
+                urgency_score += task.priority * 5
+            
+            # Calculate remaining minutes needed
+            remaining_minutes = task_estimated - task_allocated
+            
+            urgent_tasks.append({
+                'task': task,
+                'subject_id': subject_id,
+                'estimated_minutes': remaining_minutes,  # Use remaining minutes, not total
+                'urgency_score': urgency_score,
+                # Snapshots read again while scheduling the task's chunks
+                'deadline_date': task_deadline_date,
+                'task_estimated': task_estimated
+            })
         
         # Sort urgent tasks by urgency (highest first)
         urgent_tasks.sort(key=lambda x: x['urgency_score'], reverse=True)
@@ -878,8 +952,7 @@ class StudyScheduler:
             
             # For urgent tasks (due today or tomorrow), allow scheduling even if allocation is 0
             # Deadlines should override allocation limits
-            task_deadline_date = task.deadline.date() if task.deadline else None
-            is_urgent = task_deadline_date and task_deadline_date <= tomorrow
+            is_urgent = task_info['deadline_date'] <= tomorrow
             
             if subject_id not in remaining_allocation:
                 urgent_task_index += 1
@@ -892,8 +965,8 @@ class StudyScheduler:
                 continue
             
             # Re-filter available slots
-            available_slots = [s for s in available_slots if self._is_slot_available(booked_slots, s, 30)]  # Min 30 min check
-            if not available_slots:
+            open_slots &= ~_blocked_starts(booked_slots, self._slot_span(30))  # Min 30 min check
+            if not open_slots:
                 urgent_task_index += 1
                 continue
             
@@ -911,7 +984,7 @@ class StudyScheduler:
             
             # Schedule each chunk
             task_allocated = self.task_allocated_minutes.get(task.id, 0)
-            task_estimated = task.estimated_time if task.estimated_time and task.estimated_time > 0 else base_session_minutes
+            task_estimated = task_info['task_estimated']
             
             # Track whether we've already moved to the next task
             task_completed = False
@@ -932,45 +1005,22 @@ class StudyScheduler:
                         break
                 
                 # Re-filter available slots
-                available_slots = [s for s in available_slots if self._is_slot_available(booked_slots, s, chunk_minutes)]
-                if not available_slots:
+                open_slots &= ~_blocked_starts(booked_slots, self._slot_span(chunk_minutes))
+                if not open_slots:
                     break  # No more available time, will retry this task later
                 
-                # Find next available slot
-                slot_index = -1
-                for i, slot_start in enumerate(available_slots):
-                    if self._is_slot_available(booked_slots, slot_start, chunk_minutes):
-                        slot_index = i
-                        break
-                
-                if slot_index == -1:
-                    break  # No more available time, will retry this task later
-                
-                slot_start = available_slots[slot_index]
-                slot_end = slot_start + datetime.timedelta(minutes=chunk_minutes)
-                
-                # Create session
-                session = {
-                    'subject_id': subject_id,
-                    'subject_name': subject_map[subject_id].name,
-                    'start_time': slot_start,
-                    'end_time': slot_end,
-                    'task_id': task.id,
-                    'task_title': task.title,
-                    'color': subject_map[subject_id].color if hasattr(subject_map[subject_id], 'color') else "#3498db"
-                }
+                # Next available slot: every slot left fits the chunk
+                slot_bit = _lowest_bit(open_slots)
                 
+                # Create session and mark time as booked (session + break)
+                session, booked_slots = self._book_session(
+                    subject_id, slot_bit, slot_starts[slot_bit], chunk_minutes,
+                    booked_slots, self._slot_span(chunk_minutes + break_minutes), task
+                )
                 day_sessions.append(session)
                 
-                # Mark time as booked (session + break)
-                self._mark_time_as_booked(booked_slots, slot_start, slot_end)
-                if break_minutes > 0:
-                    break_end = slot_end + datetime.timedelta(minutes=break_minutes)
-                    self._mark_time_as_booked(booked_slots, slot_end, break_end)
-                
                 # Update remaining allocation
-                hours_used = chunk_minutes / 60
-                remaining_allocation[subject_id] -= hours_used
+                remaining_allocation[subject_id] -= chunk_minutes
                 
                 # Track task allocation (prevent duplicate scheduling)
                 self.task_allocated_minutes[task.id] += chunk_minutes
@@ -981,7 +1031,7 @@ class StudyScheduler:
                     task_completed = True
                     break  
                 # Remove used slot
-                available_slots.pop(slot_index)
+                open_slots &= ~(1 << slot_bit)
                 
                 # Interleave: After 2 sessions of same subject, switch to another if available
                 task_sessions_per_subject[subject_id] += 1
@@ -1010,83 +1060,81 @@ class StudyScheduler:
             # Otherwise, if no slots available, the loop will exit and we'll move on
         
         # PHASE 3: Schedule regular work by subject (interleaved after 1-2 sessions)
+        urgent_subject_ids = {t['subject_id'] for t in urgent_tasks}
+        priority_sort_key = self._priority_sort_key
         regular_subjects = sorted(
-            [sid for sid in remaining_allocation.keys() if sid not in [t['subject_id'] for t in urgent_tasks]],
-            key=lambda sid: -subject_map[sid].priority if sid in subject_map else 0
+            [sid for sid in remaining_allocation.keys() if sid not in urgent_subject_ids],
+            key=lambda sid: priority_sort_key.get(sid, 0)
         )
         
+        # Bit i is set while regular_subjects[i] still has allocation left, so
+        # finding the next subject is a bit scan rather than a walk over the list.
+        eligible_mask = 0
+        for i, sid in enumerate(regular_subjects):
+            if remaining_allocation.get(sid, 0) > 0:
+                eligible_mask |= 1 << i
+        
         current_subject_index = 0
-        max_regular_iterations = len(regular_subjects) * 50  # Safety limit
-        regular_iterations = 0
         
-        while current_subject_index < len(regular_subjects) and available_slots and regular_iterations < max_regular_iterations:
-            regular_iterations += 1
+        while eligible_mask and open_slots:
+            # Next eligible subject at or after current_subject_index, wrapping around
+            ahead = eligible_mask >> current_subject_index << current_subject_index
+            candidates = ahead or eligible_mask
+            current_subject_index = (candidates & -candidates).bit_length() - 1
             subject_id = regular_subjects[current_subject_index]
             
-            if remaining_allocation.get(subject_id, 0) <= 0:
-                current_subject_index = (current_subject_index + 1) % len(regular_subjects) if regular_subjects else 0
-                continue
+            if not eligible_mask & (eligible_mask - 1):
+                # Only one subject left, so there is nothing to interleave with
+                sessions, booked_slots, remaining_allocation[subject_id] = self._fill_slots_with_subject(
+                    subject_id, slot_starts, open_slots, booked_slots, remaining_allocation[subject_id],
+                    base_session_minutes, session_span, session_and_break_span
+                )
+                day_sessions.extend(sessions)
+                break
             
             # Re-filter available slots
-            available_slots = [s for s in available_slots if self._is_slot_available(booked_slots, s, base_session_minutes)]
-            if not available_slots:
+            open_slots &= ~_blocked_starts(booked_slots, session_span)
+            if not open_slots:
                 break
             
             # Schedule 1-2 sessions for this subject, then switch
-            sessions_to_schedule = min(2, math.ceil(remaining_allocation[subject_id] / (base_session_minutes / 60)))
+            sessions_to_schedule = min(2, -(-remaining_allocation[subject_id] // base_session_minutes))
             sessions_scheduled_this_round = 0
             
             for _ in range(sessions_to_schedule):
-                if not available_slots:
+                if not open_slots:
                     break
                 
-                slot_index = -1
-                for i, slot_start in enumerate(available_slots):
-                    if self._is_slot_available(booked_slots, slot_start, base_session_minutes):
-                        slot_index = i
-                        break
-                
-                if slot_index == -1:
+                free_slots = open_slots & ~_blocked_starts(booked_slots, session_span)
+                if not free_slots:
                     break  # No available slots for this subject
                 
-                slot_start = available_slots[slot_index]
-                slot_end = slot_start + datetime.timedelta(minutes=base_session_minutes)
-                
-                session = {
-                    'subject_id': subject_id,
-                    'subject_name': subject_map[subject_id].name,
-                    'start_time': slot_start,
-                    'end_time': slot_end,
-                    'color': subject_map[subject_id].color if hasattr(subject_map[subject_id], 'color') else "#3498db"
-                }
-                
+                slot_bit = _lowest_bit(free_slots)
+                session, booked_slots = self._book_session(
+                    subject_id, slot_bit, slot_starts[slot_bit], base_session_minutes,
+                    booked_slots, session_and_break_span
+                )
                 day_sessions.append(session)
-                self._mark_time_as_booked(booked_slots, slot_start, slot_end)
-                
-                if break_minutes > 0:
-                    break_end = slot_end + datetime.timedelta(minutes=break_minutes)
-                    self._mark_time_as_booked(booked_slots, slot_end, break_end)
                 
-                hours_used = base_session_minutes / 60
-                remaining_allocation[subject_id] -= hours_used
-                available_slots.pop(slot_index)
+                remaining_allocation[subject_id] -= base_session_minutes
+                open_slots &= ~(1 << slot_bit)
                 sessions_scheduled_this_round += 1
             
-            # If we couldn't schedule any sessions for this subject, move to next
             if sessions_scheduled_this_round == 0:
-                current_subject_index = (current_subject_index + 1) % len(regular_subjects) if regular_subjects else 0
-            else:
-                # Switch to next subject (round-robin) after scheduling 1-2 sessions
-                current_subject_index = (current_subject_index + 1) % len(regular_subjects) if regular_subjects else 0
+                break  # Slots are shared by all subjects, so nobody else fits either
+            
+            if remaining_allocation[subject_id] <= 0:
+                eligible_mask &= ~(1 << current_subject_index)
+            
+            # Switch to next subject (round-robin) after scheduling 1-2 sessions
+            current_subject_index = (current_subject_index + 1) % len(regular_subjects)
         
         return day_sessions
     
     def _calculate_daily_allocation(self, total_subject_allocation, date_range_days):
         """Calculate hours per day for each subject."""
         daily_allocation = {}
-        days_per_week = 5
-        if self.study_preference and hasattr(self.study_preference, 'days_per_week'):
-            days_per_week = self.study_preference.days_per_week
+        days_per_week = self._days_per_week
         
         for subject_id, total_hours in total_subject_allocation.items():
             effective_days = min(days_per_week, date_range_days) if date_range_days < 7 else days_per_week
@@ -1097,56 +1145,46 @@ class StudyScheduler:
     
     def _get_urgent_task_minutes_by_subject(self, due_date: datetime.date) -> Dict[int, int]:
         """Return total minutes of work due on/before the given date for each subject."""
-        from models.database import Task
-
-        session_minutes = self.get_session_length()
-        if session_minutes <= 0:
-            session_minutes = 60
-
         urgent_minutes = {}
-        for subject in self.subjects:
-            tasks = Task.query.filter_by(subject_id=subject.id, completed=False).all()
-            total = 0
-            for task in tasks:
-                if not task.deadline:
-                    continue
-                if task.deadline.date() <= due_date:
-                    estimate = task.estimated_time if task.estimated_time and task.estimated_time > 0 else session_minutes
-                    total += estimate
-            if total > 0:
-                urgent_minutes[subject.id] = total
+        workload = self._get_task_workload()
+        for subject_id in self._subject_ids:
+            if subject_id not in workload:
+                continue
+            _, deadlines, due_totals = workload[subject_id]
+            due_count = bisect.bisect_right(deadlines, due_date)
+            if due_count:
+                urgent_minutes[subject_id] = due_totals[due_count - 1]
         return urgent_minutes
 
-    def _calculate_today_allocation(self, total_subject_allocation, hours_allocated, 
+    def _calculate_today_allocation(self, total_subject_allocation, minutes_allocated, 
                                     days_since_last_studied, daily_allocation, current_date):
         """Calculate allocation for today based on priorities and remaining hours."""
         today_allocation = {}
-        session_minutes = self.get_session_length()
+        session_minutes = self._session_minutes
         if session_minutes <= 0:
             session_minutes = 60
         urgent_minutes_due = self._get_urgent_task_minutes_by_subject(current_date.date())
-        urgent_hours_allocation = {}
         
         overdue_subjects = sorted(
             [(sid, days) for sid, days in days_since_last_studied.items()
-             if days >= 2 and total_subject_allocation[sid] - hours_allocated[sid] > 0],
+             if days >= 2 and total_subject_allocation[sid] * 60 - minutes_allocated[sid] > 0],
             key=lambda x: x[1], reverse=True
         )
         
         for subject_id, _ in overdue_subjects:
-            remaining = total_subject_allocation[subject_id] - hours_allocated[subject_id]
-            today_allocation[subject_id] = min(daily_allocation[subject_id], remaining) if remaining > 0 else 0
+            remaining_minutes = total_subject_allocation[subject_id] * 60 - minutes_allocated[subject_id]
+            today_allocation[subject_id] = min(daily_allocation[subject_id], remaining_minutes / 60) if remaining_minutes > 0 else 0
         
         for subject_id, total_hours in total_subject_allocation.items():
             if subject_id not in today_allocation:
-                remaining = total_hours - hours_allocated[subject_id]
-                today_allocation[subject_id] = min(daily_allocation[subject_id], remaining) if remaining > 0 else 0
+                remaining_minutes = total_hours * 60 - minutes_allocated[subject_id]
+                today_allocation[subject_id] = min(daily_allocation[subject_id], remaining_minutes / 60) if remaining_minutes > 0 else 0
 
         # Boost allocation for tasks whose deadlines are today or already overdue
         for subject_id, urgent_minutes in urgent_minutes_due.items():
             if subject_id not in total_subject_allocation:
                 continue
-            allocated_minutes = hours_allocated[subject_id] * 60
+            allocated_minutes = minutes_allocated[subject_id]
             urgent_minutes_remaining = max(0, urgent_minutes - allocated_minutes)
             if urgent_minutes_remaining <= 0:
                 continue
@@ -1154,23 +1192,18 @@ class StudyScheduler:
             if urgent_hours_needed <= 0:
                 continue
             today_allocation[subject_id] = max(today_allocation.get(subject_id, 0), urgent_hours_needed)
-            urgent_hours_allocation[subject_id] = urgent_hours_needed
         
-        self._current_day_urgent_hours = urgent_hours_allocation
         return today_allocation
     
-    def _update_tracking(self, daily_sessions, hours_allocated, days_since_last_studied, subject_time_tracking):
+    def _update_tracking(self, daily_sessions, minutes_allocated, days_since_last_studied):
         """Update tracking data after scheduling daily sessions."""
         subjects_studied_today = set()
         for session in daily_sessions:
             subject_id = session['subject_id']
             subjects_studied_today.add(subject_id)
             
-            duration_hours = (session['end_time'] - session['start_time']).total_seconds() / 3600
-            hours_allocated[subject_id] += duration_hours
-            
-            session_hour = session['start_time'].hour
-            subject_time_tracking[subject_id][session_hour] += 1
+            duration_minutes = round((session['end_time'] - session['start_time']).total_seconds() / 60)
+            minutes_allocated[subject_id] += duration_minutes
         
         for subject_id in subjects_studied_today:
             days_since_last_studied[subject_id] = 0
@@ -1181,33 +1214,22 @@ class StudyScheduler:
         Returns:
             Dict with 'warnings' list and 'urgent_tasks' info
         """
-        from models.database import Task
-        
         warnings = []
         urgent_tasks = []
         today = datetime.datetime.now(datetime.timezone.utc).date()
         
-        # Find all urgent tasks (due today or tomorrow)
-        for subject in self.subjects:
-            tasks = Task.query.filter_by(
-                subject_id=subject.id,
-                completed=False
-            ).all()
-            
-            for task in tasks:
-                if not task.deadline:
-                    continue
-                
-                days_to_deadline = (task.deadline.date() - today).days
-                
-                if days_to_deadline <= 1:  # Due today or tomorrow
-                    urgent_tasks.append({
-                        'subject': subject.name,
-                        'task': task.title,
-                        'deadline': task.deadline,
-                        'estimated_time': task.estimated_time or 60,
-                        'days_to_deadline': days_to_deadline
-                    })
+        # Find all urgent tasks (due today or tomorrow, or already overdue),
+        # listed in subject-then-task order
+        deadline_dates, dated_tasks = self._get_dated_tasks()
+        due_soon = dated_tasks[:bisect.bisect_right(deadline_dates, today + datetime.timedelta(days=1))]
+        for deadline_date, _, subject_id, task, _ in sorted(due_soon, key=lambda row: row[1]):
+            urgent_tasks.append({
+                'subject': self._subject_labels[subject_id][0],
+                'task': task.title,
+                'deadline': task.deadline,
+                'estimated_time': task.estimated_time or 60,
+                'days_to_deadline': (deadline_date - today).days
+            })
         
         if urgent_tasks:
             total_urgent_minutes = sum(t['estimated_time'] for t in urgent_tasks)
@@ -1244,27 +1266,34 @@ class StudyScheduler:
         
         daily_allocation = self._calculate_daily_allocation(total_subject_allocation, date_range_days)
         
-        subject_time_tracking = {sid: defaultdict(int) for sid in total_subject_allocation}
-        hours_allocated = dict.fromkeys(total_subject_allocation, 0)
+        minutes_allocated = dict.fromkeys(total_subject_allocation, 0)
         days_since_last_studied = dict.fromkeys(total_subject_allocation, 0)
+        # Booked-slot mask per date, updated as each day's sessions are added so
+        # the growing schedule is never re-scanned
+        booked_by_date: Dict[datetime.date, int] = {}
         
-        current_date = self.start_date
-        while current_date.date() <= self.end_date.date():
+        for day_offset in range(date_range_days):
+            current_date = self.start_date + datetime.timedelta(days=day_offset)
+            current_day = current_date.date()
             for subject_id in total_subject_allocation:
                 days_since_last_studied[subject_id] += 1
             
             today_allocation = self._calculate_today_allocation(
-                total_subject_allocation, hours_allocated, days_since_last_studied,
+                total_subject_allocation, minutes_allocated, days_since_last_studied,
                 daily_allocation, current_date
             )
             
             daily_sessions = self.build_daily_schedule(
-                current_date, today_allocation, schedule
+                current_date, today_allocation, schedule,
+                booked_slots=booked_by_date.get(current_day, 0)
+            )
+            booked_by_date[current_day] = (
+                booked_by_date.get(current_day, 0)
+                | self._build_booked_slots(daily_sessions, current_date)
             )
             
-            self._update_tracking(daily_sessions, hours_allocated, days_since_last_studied, subject_time_tracking)
+            self._update_tracking(daily_sessions, minutes_allocated, days_since_last_studied)
             schedule.extend(daily_sessions)
-            current_date += datetime.timedelta(days=1)
         
         return schedule
     
@@ -1286,13 +1315,8 @@ class StudyScheduler:
         Returns:
             Tuple of (task_id, suggested_session_type) or None if no suitable task
         """
-        from models.database import Task
-        
         # Get all incomplete tasks for this subject
-        tasks = Task.query.filter_by(
-            subject_id=subject_id,
-            completed=False
-        ).all()
+        tasks = self._get_incomplete_tasks_by_subject().get(subject_id, [])
         
         if not tasks:
             return None
@@ -1323,22 +1347,11 @@ class StudyScheduler:
             
             # 1. Deadline urgency (0-50 points) - but only for tasks due today or future
             if task.deadline:
-                days_to_deadline = (task.deadline.date() - today).days
-                if days_to_deadline == 0:
-                    score += 50  # Due TODAY - highest priority
-                elif days_to_deadline == 1:
-                    score += 45  # Due TOMORROW
-                elif days_to_deadline <= 3:
-                    score += 35  # Due very soon
-                elif days_to_deadline <= 7:
-                    score += 25  # Due this week
-                elif days_to_deadline <= 14:
-                    score += 15  # Due in 2 weeks
-                else:
-                    score += 5  # Future deadline
+                days_to_deadline = (task_deadline_date - today).days
+                score += _SUGGESTION_DEADLINE_POINTS[bisect.bisect_left(_SUGGESTION_DAY_BOUNDS, days_to_deadline)]
             
             # 2. Task priority (0-15 points)
-            if hasattr(task, 'priority') and task.priority:
+            if task.priority:
                 score += task.priority * 3  # 1-5 priority → 3-15 points
             
             # 3. Time match bonus (0-20 points)
@@ -1356,7 +1369,7 @@ class StudyScheduler:
                     score += 5
             
             # 4. Recently created tasks get slight boost (0-5 points)
-            if hasattr(task, 'created_at') and task.created_at:
+            if task.created_at:
                 days_old = (today - task.created_at.date()).days
                 if days_old <= 2:
                     score += 5
@@ -1371,29 +1384,30 @@ class StudyScheduler:
                 best_remaining = remaining_minutes
         
         if best_task:
-            # Suggest session type based on task characteristics
-            suggested_type = 'assignment'  # Default for tasks
-            
-            # If task mentions certain keywords, adjust type
-            if best_task.title and best_task.description:
-                combined_text = (best_task.title + ' ' + best_task.description).lower()
-                if any(word in combined_text for word in ['practice', 'exercise', 'problem set', 'drill']):
-                    suggested_type = 'practice'
-                elif any(word in combined_text for word in ['review', 'study', 'prepare', 'exam', 'test', 'quiz']):
-                    suggested_type = 'review'
-                elif any(word in combined_text for word in ['learn', 'read', 'chapter', 'lecture']):
-                    suggested_type = 'learn'
+            # Suggest session type based on task keywords, assignment by default
+            suggested_type = self._task_session_type(best_task) or 'assignment'
             
             # Track that we've allocated time to this task (prevents duplicate suggestions)
             # Update allocation - but only allocate what's remaining, not more
             # Use best_remaining which we tracked earlier
             allocation_to_add = min(session_duration_minutes, best_remaining)
-            self.task_allocated_minutes[best_task.id] = self.task_allocated_minutes.get(best_task.id, 0) + allocation_to_add
+            self.task_allocated_minutes[best_task.id] += allocation_to_add
             
             return (best_task.id, suggested_type)
         
         return None
     
+    def _task_session_type(self, task) -> Optional[str]:
+        """Session type name suggested by a task's keywords, or None if it lacks
+        a title or description. Classified once per task for this scheduler.
+        """
+        if task.id not in self._task_session_types:
+            suggested_type = None
+            if task.title and task.description:
+                suggested_type = _classify_task_text(task.title, task.description)
+            self._task_session_types[task.id] = suggested_type
+        return self._task_session_types[task.id]
+    
     def save_schedule_to_db(self, schedule, db=None):
         """Save the generated schedule to the database with intelligent task linking.
         
@@ -1404,9 +1418,19 @@ class StudyScheduler:
         Returns:
             List of created session objects
         """
-        from models.database import StudySession, SessionStatus, SessionType
+        # Load every linked, still incomplete task in one query rather than one
+        # lookup per session; links to tasks missing from the result are cleared
+        linked_task_ids = {session['task_id'] for session in schedule if session.get('task_id')}
+        tasks_by_id = {}
+        if linked_task_ids:
+            tasks_by_id = {
+                task.id: task for task in Task.query.filter(
+                    Task.id.in_(linked_task_ids),
+                    Task.completed == False
+                )
+            }
         
-        created_sessions = []
+        session_rows = []
         for session in schedule:
             session_duration = (session['end_time'] - session['start_time']).total_seconds() / 60
             
@@ -1416,11 +1440,10 @@ class StudyScheduler:
             
             if task_id:
                 # Task already linked, validate it's still valid
-                from models.database import Task
-                task = Task.query.get(task_id)
+                task = tasks_by_id.get(task_id)
                 
                 # If task doesn't exist or is completed, clear the link
-                if not task or (hasattr(task, 'completed') and task.completed):
+                if not task:
                     task_id = None
                     task = None
                 
@@ -1439,21 +1462,9 @@ class StudyScheduler:
                 # 2. If a session was created with task_id, it means the task needed that time
                 # 3. Multiple sessions can be linked to the same task if it needs more time
                 
-                if task and task.title and task.description:
-                    combined_text = (task.title + ' ' + (task.description or '')).lower()
-                    if any(word in combined_text for word in ['practice', 'exercise', 'problem set', 'drill']):
-                        suggested_type = 'practice'
-                    elif any(word in combined_text for word in ['review', 'study', 'prepare', 'exam', 'test', 'quiz']):
-                        suggested_type = 'review'
-                    elif any(word in combined_text for word in ['learn', 'read', 'chapter', 'lecture']):
-                        suggested_type = 'learn'
-                    else:
-                        suggested_type = 'assignment'
-                    
-                    try:
-                        session_type = SessionType[suggested_type]
-                    except (KeyError, AttributeError):
-                        session_type = SessionType.assignment
+                suggested_type = self._task_session_type(task) if task else None
+                if suggested_type:
+                    session_type = _SESSION_TYPES_BY_NAME.get(suggested_type, SessionType.assignment)
             else:
                 # No task linked, suggest one using old method
                 task_suggestion = self._suggest_task_for_session(
@@ -1464,22 +1475,20 @@ class StudyScheduler:
                 
                 if task_suggestion:
                     task_id, suggested_type = task_suggestion
-                    try:
-                        session_type = SessionType[suggested_type]
-                    except (KeyError, AttributeError):
-                        session_type = SessionType.assignment  # Fallback to assignment if invalid
-            
-            # Create a new StudySession object
-            db_session = StudySession(
-                user_id=self.user.id,
-                subject_id=session['subject_id'],
-                start_time=session['start_time'],
-                end_time=session['end_time'],
-                status=SessionStatus.planned,
-                session_type=session_type,
-                task_id=task_id,  # NOW LINKED!
-                completed=False
-            )
+                    # Fall back to assignment if the suggested type is unknown
+                    session_type = _SESSION_TYPES_BY_NAME.get(suggested_type, SessionType.assignment)
+            
+            # Collect the StudySession row; all rows are inserted together below
+            session_rows.append({
+                'user_id': self.user.id,
+                'subject_id': session['subject_id'],
+                'start_time': session['start_time'],
+                'end_time': session['end_time'],
+                'status': SessionStatus.planned,
+                'session_type': session_type,
+                'task_id': task_id,  # NOW LINKED!
+                'completed': False
+            })
             
             # Track task allocation if task is linked (to prevent duplicate scheduling across days)
             if task_id and task:
@@ -1490,12 +1499,15 @@ class StudyScheduler:
                     pass  # Already tracked in build_daily_schedule
                 # Note: We don't double-count here because allocation was already tracked
                 # during build_daily_schedule. This is just for validation.
-            
-            if db:
-                db.session.add(db_session)
-                created_sessions.append(db_session)
         
+        created_sessions = []
         if db:
+            if session_rows:
+                # One multi-row INSERT instead of a unit-of-work flush per object
+                created_sessions = db.session.scalars(
+                    insert(StudySession).returning(StudySession, sort_by_parameter_order=True),
+                    session_rows
+                ).all()
             db.session.commit()
             
         # Log warnings if any
@@ -1,15 +1,32 @@
 import os
 import sys
+from functools import partial
 
 import pytest
 from sqlalchemy.pool import StaticPool
+from werkzeug.security import generate_password_hash
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app
+from models import database
 from models.database import db, User, StudyPreference
 
 
+@pytest.fixture(autouse=True)
+def fast_password_hashing(monkeypatch):
+    """Hash test passwords with a cheap work factor.
+
+    The default scrypt hash takes a noticeable fraction of a second per user,
+    far more than creating the in-memory schema. check_password_hash reads
+    the method from the stored hash, so logins work unchanged.
+    """
+    monkeypatch.setattr(
+        database, 'generate_password_hash',
+        partial(generate_password_hash, method='pbkdf2:sha256:1000')
+    )
+
+
 @pytest.fixture()
 def app():
     test_app = create_app({
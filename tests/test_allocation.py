@@ -212,8 +212,8 @@ class TestAllocateHours(unittest.TestCase):
         result1 = allocate_hours(weights, total_hours)
         result2 = allocate_hours(weights, total_hours)
         
-        # Should be identical
-        self.assertEqual(result1, result2)
+        # Should be identical, including key order
+        self.assertEqual(list(result1.items()), list(result2.items()))
 
 
 class TestAllocationEdgeCases(unittest.TestCase):
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+from models.database import db, Subject, StudySession, SessionStatus, StudyPreference, User
+from models.missed_sessions import (
+    mark_missed_sessions, mark_missed_sessions_all, get_missed_sessions_summary
+)
+
+
+def _create_user(username):
+    user = User(username=username, email=f'{username}@example.com')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def _create_session(user, subject, end_time, locked=False):
+    session = StudySession(
+        user_id=user.id,
+        subject_id=subject.id,
+        start_time=end_time - timedelta(hours=1),
+        end_time=end_time,
+        status=SessionStatus.planned,
+        locked=locked
+    )
+    db.session.add(session)
+    return session
+
+
+def test_mark_missed_sessions_all_updates_every_user(app):
+    with app.app_context():
+        past = datetime.now(timezone.utc) - timedelta(hours=2)
+        future = datetime.now(timezone.utc) + timedelta(hours=2)
+
+        for name in ('alice', 'bob'):
+            user = _create_user(name)
+            subject = Subject(user_id=user.id, name='Math', priority=3, difficulty=3)
+            db.session.add(subject)
+            db.session.flush()
+            _create_session(user, subject, past)
+            _create_session(user, subject, past, locked=True)
+            _create_session(user, subject, future)
+        db.session.commit()
+
+        assert mark_missed_sessions_all(grace_minutes=30) == 2
+        assert StudySession.query.filter_by(status=SessionStatus.missed).count() == 2
+
+        # Nothing left to mark on a second pass
+        assert mark_missed_sessions_all(grace_minutes=30) == 0
+
+
+def test_mark_missed_all_command_honours_user_grace(app):
+    with app.app_context():
+        ended = datetime.now(timezone.utc) - timedelta(minutes=45)
+
+        for name, grace in (('frank', None), ('grace', 60), ('heidi', 20)):
+            user = _create_user(name)
+            if grace is not None:
+                db.session.add(StudyPreference(user_id=user.id, grace_minutes=grace))
+            subject = Subject(user_id=user.id, name='Math', priority=3, difficulty=3)
+            db.session.add(subject)
+            db.session.flush()
+            _create_session(user, subject, ended)
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['jobs', 'mark-missed-all'])
+
+        assert '2 session(s) marked as missed' in result.output
+        # Ended 45 minutes ago: still inside the 60-minute grace period
+        assert StudySession.query.filter_by(status=SessionStatus.planned).count() == 1
+
+    response = app.test_client().post('/jobs/mark_missed_all')
+    assert response.status_code == 404
+
+
+def test_mark_missed_sessions_scoped_to_user(app):
+    with app.app_context():
+        past = datetime.now(timezone.utc) - timedelta(hours=2)
+
+        users = [_create_user('carol'), _create_user('dave')]
+        for user in users:
+            subject = Subject(user_id=user.id, name='History', priority=3, difficulty=3)
+            db.session.add(subject)
+            db.session.flush()
+            _create_session(user, subject, past)
+        db.session.commit()
+
+        assert mark_missed_sessions(users[0].id) == 1
+        assert StudySession.query.filter_by(
+            user_id=users[1].id, status=SessionStatus.planned
+        ).count() == 1
+
+
+def test_missed_sessions_summary_groups_by_subject(app):
+    with app.app_context():
+        user = _create_user('erin')
+        subjects = []
+        for name in ('Math', 'Physics'):
+            subject = Subject(user_id=user.id, name=name, priority=3, difficulty=3)
+            db.session.add(subject)
+            subjects.append(subject)
+        db.session.flush()
+
+        past = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(hours=3)
+        _create_session(user, subjects[0], past)
+        _create_session(user, subjects[0], past - timedelta(days=1))
+        _create_session(user, subjects[1], past)
+        db.session.commit()
+        mark_missed_sessions(user.id)
+
+        summary = get_missed_sessions_summary(user.id)
+
+        assert summary['count'] == 3
+        assert round(summary['total_minutes']) == 180
+        assert summary['by_subject'][subjects[0].id]['name'] == 'Math'
+        assert summary['by_subject'][subjects[0].id]['count'] == 2
+        assert round(summary['by_subject'][subjects[0].id]['minutes']) == 120
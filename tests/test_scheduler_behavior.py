@@ -1,6 +1,6 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 
-from models.database import db, Subject, Task, StudySession, User
+from models.database import db, ClassBlock, Subject, Task, StudySession, User, UserConstraint
 from models.scheduler import StudyScheduler
 
 
@@ -19,9 +19,10 @@ def _create_subject(user, name, priority=3, difficulty=3, workload=4):
 
 
 def _create_task(user, subject, title, deadline, estimated_minutes, priority=5):
+    # Linked through the relationship, so the caller's commit flushes it
     task = Task(
         user_id=user.id,
-        subject_id=subject.id,
+        subject=subject,
         title=title,
         deadline=deadline,
         estimated_time=estimated_minutes,
@@ -29,7 +30,6 @@ def _create_task(user, subject, title, deadline, estimated_minutes, priority=5):
         completed=False
     )
     db.session.add(task)
-    db.session.flush()
     return task
 
 
@@ -77,12 +77,14 @@ def test_deadline_tasks_take_priority(app, sample_user):
         )
 
         scheduler.save_schedule_to_db(schedule, db)
-        linked_sessions = StudySession.query.filter_by(
-            user_id=user.id,
-            subject_id=urgent_subject.id,
-            task_id=urgent_task.id
-        ).count()
-        assert linked_sessions > 0, "Urgent task should be linked to generated sessions"
+        has_linked_session = db.session.query(
+            StudySession.query.filter_by(
+                user_id=user.id,
+                subject_id=urgent_subject.id,
+                task_id=urgent_task.id
+            ).exists()
+        ).scalar()
+        assert has_linked_session, "Urgent task should be linked to generated sessions"
 
 
 def test_insufficient_hours_warns_user(app, sample_user):
@@ -116,3 +118,68 @@ def test_insufficient_hours_warns_user(app, sample_user):
         assert check['warnings'], "Expected an insufficient-hours warning"
         assert check['warnings'][0]['type'] == 'insufficient_hours'
 
+
+def test_constraints_classes_and_locked_sessions_block_time(app, sample_user):
+    user_id, _ = sample_user
+    with app.app_context():
+        user = User.query.get(user_id)
+        day = datetime(2030, 1, 7, tzinfo=timezone.utc)  # a Monday
+        subject = _create_subject(user, 'Chemistry')
+
+        db.session.add(UserConstraint(
+            user_id=user.id, title='Work', day_of_week=0,
+            start_time=time(9, 0), end_time=time(11, 0), is_hard=True
+        ))
+        db.session.add(UserConstraint(
+            user_id=user.id, title='Gym', day_of_week=0,
+            start_time=time(12, 0), end_time=time(13, 0), is_hard=False
+        ))
+        db.session.add(ClassBlock(
+            user_id=user.id, title='Lecture', day_of_week=0,
+            start_time=time(14, 0), end_time=time(15, 30)
+        ))
+        db.session.add(StudySession(
+            user_id=user.id, subject_id=subject.id,
+            start_time=day.replace(hour=16), end_time=day.replace(hour=17),
+            locked=True
+        ))
+        db.session.commit()
+
+        scheduler = StudyScheduler(
+            user=user, subjects=[subject], start_date=day, end_date=day
+        )
+
+        blocked = scheduler._is_time_blocked_by_constraints
+        assert blocked(day.replace(hour=9, minute=30))
+        assert not blocked(day.replace(hour=11))  # end is exclusive
+        assert not blocked(day.replace(hour=12, minute=30))  # soft constraint
+        assert blocked(day.replace(hour=15, minute=15))
+        assert blocked(day.replace(hour=16, minute=45))
+        assert not blocked(day.replace(hour=17))
+        # Weekly blocks only apply on their weekday
+        assert not blocked((day + timedelta(days=1)).replace(hour=9, minute=30))
+
+
+def test_booked_slot_helpers_share_semantics(app, sample_user):
+    user_id, _ = sample_user
+    with app.app_context():
+        user = User.query.get(user_id)
+        day = datetime(2030, 1, 7, tzinfo=timezone.utc)
+        subject = _create_subject(user, 'Geography')
+        scheduler = StudyScheduler(
+            user=user, subjects=[subject], start_date=day, end_date=day
+        )
+
+        start = day.replace(hour=10)
+        end = start + timedelta(hours=1)
+        booked = scheduler._build_booked_slots([
+            {'start_time': start, 'end_time': end},
+            # Sessions on other days do not book anything
+            {'start_time': start + timedelta(days=1), 'end_time': end + timedelta(days=1)},
+        ], day)
+
+        assert booked == scheduler._mark_time_as_booked(0, start, end)
+        assert not scheduler._is_slot_available(booked, start, 30)
+        assert not scheduler._is_slot_available(booked, day.replace(hour=9, minute=30), 60)
+        assert scheduler._is_slot_available(booked, day.replace(hour=9), 60)
+        assert scheduler._is_slot_available(booked, end, 60)
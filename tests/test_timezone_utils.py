@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from utils.timezone_utils import localize_to_utc, utc_to_local, format_for_client
+from utils.timezone_utils import (
+    localize_to_utc, utc_to_local, format_for_client, format_many_for_client
+)
 
 
 def test_timezone_round_trip():
@@ -20,3 +22,11 @@ def test_format_for_client():
     # Eastern time should be previous day 21:00
     assert formatted == '2025-10-30 21:00'
 
+
+def test_format_many_for_client_matches_single_formatting():
+    values = [datetime(2025, 10, 31, 1, 0), datetime(2025, 11, 3, 14, 30)]
+
+    for tz in ('America/New_York', 'UTC', 'Not/AZone'):
+        assert format_many_for_client(values, tz, '%Y-%m-%d %H:%M') == [
+            format_for_client(value, tz, '%Y-%m-%d %H:%M') for value in values
+        ]
@@ -5,8 +5,23 @@ Handles conversion between user's local timezone and UTC for proper datetime sto
 All datetimes are stored in UTC in the database and converted to user's timezone for display.
 """
 from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
-import pytz
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+from dateutil.parser import isoparse
+
+
+@lru_cache(maxsize=512)
+def _cached_zoneinfo(tz_name):
+    """Return the ZoneInfo for tz_name, or None if it is not a valid zone.
+    
+    Lookups are memoized by name, failures included, so a bad stored
+    timezone costs one failed lookup instead of an exception per call.
+    """
+    try:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return None
 
 
 def get_user_timezone(user):
@@ -18,11 +33,8 @@ def get_user_timezone(user):
     Returns:
         ZoneInfo: User's timezone
     """
-    try:
-        return ZoneInfo(user.timezone)
-    except Exception:
-        # Fallback to UTC if invalid timezone
-        return ZoneInfo('UTC')
+    # Fallback to UTC if invalid timezone
+    return _cached_zoneinfo(getattr(user, 'timezone', None)) or _cached_zoneinfo('UTC')
 
 
 def localize_to_utc(dt_naive, user_tz_str='UTC'):
@@ -40,17 +52,24 @@ def localize_to_utc(dt_naive, user_tz_str='UTC'):
         >>> utc_dt = localize_to_utc(dt, 'America/Los_Angeles')
         >>> # Returns 2024-10-29 21:00:00+00:00 (9 PM UTC)
     """
-    try:
-        local_tz = ZoneInfo(user_tz_str)
-        # Add timezone info to naive datetime
-        local_dt = dt_naive.replace(tzinfo=local_tz)
-        # Convert to UTC
-        return local_dt.astimezone(timezone.utc)
-    except Exception:
-        # If conversion fails, assume it's already UTC
-        if dt_naive.tzinfo is None:
-            return dt_naive.replace(tzinfo=timezone.utc)
-        return dt_naive
+    if user_tz_str == 'UTC':
+        # Already UTC wall time: no zone lookup or conversion needed
+        return dt_naive.replace(tzinfo=timezone.utc)
+    
+    local_tz = _cached_zoneinfo(user_tz_str)
+    if local_tz is not None:
+        try:
+            # Add timezone info to naive datetime
+            local_dt = dt_naive.replace(tzinfo=local_tz)
+            # Convert to UTC
+            return local_dt.astimezone(timezone.utc)
+        except Exception:
+            pass
+    
+    # If the timezone is unknown or conversion fails, assume it's already UTC
+    if dt_naive.tzinfo is None:
+        return dt_naive.replace(tzinfo=timezone.utc)
+    return dt_naive
 
 
 def utc_to_local(dt_utc, user_tz_str='UTC'):
@@ -73,8 +92,14 @@ def utc_to_local(dt_utc, user_tz_str='UTC'):
         if dt_utc.tzinfo is None:
             dt_utc = dt_utc.replace(tzinfo=timezone.utc)
         
-        # Convert to user's timezone
-        local_tz = ZoneInfo(user_tz_str)
+        if user_tz_str == 'UTC':
+            # UTC users skip the zone lookup; aware non-UTC input is still converted
+            return dt_utc.astimezone(timezone.utc)
+        
+        # Convert to user's timezone; unknown timezones return it as-is
+        local_tz = _cached_zoneinfo(user_tz_str)
+        if local_tz is None:
+            return dt_utc
         return dt_utc.astimezone(local_tz)
     except Exception:
         # Fallback: return as-is
@@ -93,10 +118,12 @@ def parse_client_datetime(iso_string, user_tz_str='UTC'):
     Returns:
         datetime: Timezone-aware datetime in UTC
     """
-    from dateutil import parser
-    
     try:
-        dt = parser.isoparse(iso_string)
+        try:
+            # The stdlib parser covers what browsers send; dateutil handles the rest of ISO 8601
+            dt = datetime.fromisoformat(iso_string)
+        except ValueError:
+            dt = isoparse(iso_string)
         
         # If naive (no timezone), assume it's in user's timezone
         if dt.tzinfo is None:
@@ -109,6 +136,26 @@ def parse_client_datetime(iso_string, user_tz_str='UTC'):
         return datetime.now(timezone.utc)
 
 
+# Formats used by the templates and client code, built without strftime's format parsing
+_FAST_FORMATS = {
+    '%Y-%m-%dT%H:%M:%S': lambda d: (
+        f"{d.year:04d}-{d.month:02d}-{d.day:02d}T{d.hour:02d}:{d.minute:02d}:{d.second:02d}"
+    ),
+    '%Y-%m-%d %H:%M': lambda d: (
+        f"{d.year:04d}-{d.month:02d}-{d.day:02d} {d.hour:02d}:{d.minute:02d}"
+    ),
+    '%Y-%m-%d': lambda d: d.date().isoformat(),
+}
+
+
+def _format_local(local_dt, format_str):
+    """strftime, with a fast path for the formats in _FAST_FORMATS."""
+    fast_format = _FAST_FORMATS.get(format_str)
+    if fast_format is not None:
+        return fast_format(local_dt)
+    return local_dt.strftime(format_str)
+
+
 def format_for_client(dt_utc, user_tz_str='UTC', format_str='%Y-%m-%dT%H:%M:%S'):
     """Format UTC datetime for sending to client.
     
@@ -121,59 +168,102 @@ def format_for_client(dt_utc, user_tz_str='UTC', format_str='%Y-%m-%dT%H:%M:%S')
         str: Formatted datetime string in user's timezone
     """
     local_dt = utc_to_local(dt_utc, user_tz_str)
-    return local_dt.strftime(format_str)
+    return _format_local(local_dt, format_str)
+
+
+def format_many_for_client(dts_utc, user_tz_str='UTC', format_str='%Y-%m-%dT%H:%M:%S'):
+    """Format several UTC datetimes for the client, resolving the timezone once.
+    
+    Args:
+        dts_utc: Iterable of UTC datetimes (naive or aware)
+        user_tz_str: User's timezone
+        format_str: strftime format string
+    
+    Returns:
+        list: Formatted strings, in the same order as dts_utc
+    """
+    local_tz = _cached_zoneinfo(user_tz_str)
+    if local_tz is None:
+        # Invalid timezone: keep format_for_client's per-value fallback
+        return [format_for_client(dt, user_tz_str, format_str) for dt in dts_utc]
+    
+    formatted = []
+    for dt in dts_utc:
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        formatted.append(_format_local(dt.astimezone(local_tz), format_str))
+    return formatted
+
+
+# Zones offered in the timezone dropdown
+_COMMON_TZ_NAMES = (
+    'UTC',
+    'America/New_York',
+    'America/Chicago',
+    'America/Denver',
+    'America/Los_Angeles',
+    'America/Anchorage',
+    'Pacific/Honolulu',
+    'Europe/London',
+    'Europe/Paris',
+    'Europe/Berlin',
+    'Asia/Tokyo',
+    'Asia/Shanghai',
+    'Asia/Dubai',
+    'Australia/Sydney',
+    'America/Toronto',
+    'America/Mexico_City',
+    'America/Sao_Paulo',
+)
+
+# (UTC hour, dropdown entries) from the last get_common_timezones call
+_common_timezones_cache = None
 
 
 def get_common_timezones():
     """Get list of common timezones for dropdown.
     
+    Offsets only change at DST transitions, which fall on the hour in UTC,
+    so the entries are rebuilt at most once per UTC hour.
+    
     Returns:
         list: List of (timezone_name, display_name) tuples
     """
-    common_tzs = [
-        'UTC',
-        'America/New_York',
-        'America/Chicago',
-        'America/Denver',
-        'America/Los_Angeles',
-        'America/Anchorage',
-        'Pacific/Honolulu',
-        'Europe/London',
-        'Europe/Paris',
-        'Europe/Berlin',
-        'Asia/Tokyo',
-        'Asia/Shanghai',
-        'Asia/Dubai',
-        'Australia/Sydney',
-        'America/Toronto',
-        'America/Mexico_City',
-        'America/Sao_Paulo',
-    ]
+    global _common_timezones_cache
+    
+    now = datetime.now(timezone.utc)
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    if _common_timezones_cache is not None and _common_timezones_cache[0] == hour:
+        return list(_common_timezones_cache[1])
     
     # Generate display names with current offset
     result = []
-    now = datetime.now(timezone.utc)
     
-    for tz_name in common_tzs:
-        try:
-            tz = ZoneInfo(tz_name)
-            local_time = now.astimezone(tz)
-            offset = local_time.strftime('%z')
-            # Format offset as UTC+/-X:XX
-            offset_formatted = f"UTC{offset[:3]}:{offset[3:]}"
-            display = f"{tz_name.replace('_', ' ')} ({offset_formatted})"
-            result.append((tz_name, display))
-        except Exception:
+    for tz_name in _COMMON_TZ_NAMES:
+        tz = _cached_zoneinfo(tz_name)
+        if tz is None:
             continue
+        local_time = now.astimezone(tz)
+        offset = local_time.strftime('%z')
+        # Format offset as UTC+/-X:XX
+        offset_formatted = f"UTC{offset[:3]}:{offset[3:]}"
+        display = f"{tz_name.replace('_', ' ')} ({offset_formatted})"
+        result.append((tz_name, display))
     
+    _common_timezones_cache = (hour, tuple(result))
     return result
 
 
+@lru_cache(maxsize=None)
+def _sorted_timezones():
+    """Sorted IANA zone names; the tz database is only scanned once."""
+    return tuple(sorted(available_timezones()))
+
+
 def get_all_timezones():
     """Get all available timezones.
     
     Returns:
         list: List of timezone names
     """
-    return sorted(pytz.all_timezones)
-
+    return list(_sorted_timezones())